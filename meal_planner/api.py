@@ -0,0 +1,235 @@
+"""Schlanke JSON-Schnittstelle für Home-Assistant-Sensoren, ohne Streamlit-Rerun.
+
+Endpunkte (``?profile=`` wie in der App, Standard ``default``)::
+
+    GET /api/today          Gericht des heutigen Tages
+    GET /api/week           Wochenplan
+    GET /api/meal/<id>      Gericht mit Zutaten und Rezept
+    GET /api/shopping       Einkaufsliste der Woche
+
+Jede Antwort trägt ein ETag aus Datengeneration, Planversion und Woche; sendet der
+Client es als ``If-None-Match`` zurück, gibt es ein leeres 304. Fertige
+Antworten werden pro Pfad zwischengespeichert, solange sich das ETag nicht
+ändert. Läuft als Thread neben Streamlit (``start_in_background``) oder
+eigenständig::
+
+    python api.py --port 8099
+"""
+import argparse
+import asyncio
+import datetime
+import json
+import logging
+import os
+import threading
+import time
+from urllib.parse import parse_qs, urlsplit
+
+import db
+from plan_history import week_start
+from translations import DAYS
+from user_state import DEFAULT_PROFILE, read_user_state, state_version
+
+API_HOST = os.environ.get("MEALS_API_HOST", "0.0.0.0")
+API_PORT = int(os.environ.get("MEALS_API_PORT", "8099"))
+# Offene Keep-Alive-Verbindungen werden nach so vielen Sekunden ohne Anfrage geschlossen
+KEEPALIVE_TIMEOUT = 30
+MAX_HEADER_BYTES = 16 * 1024
+# Anzahl zwischengespeicherter Antworten (Pfad + Profil)
+RESPONSE_CACHE_SIZE = 256
+
+log = logging.getLogger("meal_planner.api")
+
+# Startkennung: ETags eines früheren Prozesses gelten nie als aktuell
+_BOOT = format(int(time.time()), "x")
+_responses = {}  # (Endpunkt, Argument, Profil) -> (ETag, JSON-Bytes)
+
+REASONS = {200: "OK", 304: "Not Modified", 404: "Not Found", 405: "Method Not Allowed"}
+
+
+# ---------------------------------------------------
+# Endpunkte
+# ---------------------------------------------------
+def _meal_summary(meal):
+    if meal is None:
+        return None
+    return {"id": meal["id"], "name": meal["name"], "category": meal["category"]}
+
+
+def _week(profile):
+    plan, _, _ = read_user_state(profile)
+    plan = plan or {}
+    meals, _ = db.get_meals_by_ids(plan.values())
+    return [
+        {"day": day, "day_en": day_en, "meal": _meal_summary(meals.get(plan.get(day)))}
+        for day, day_en in zip(DAYS["DE"], DAYS["EN"])
+    ]
+
+
+def today(profile, arg):
+    index = datetime.date.today().weekday()
+    entry = _week(profile)[index]
+    meal = entry["meal"]
+    return {
+        "date": datetime.date.today().isoformat(),
+        "day": entry["day"],
+        "day_en": entry["day_en"],
+        "name": meal["name"] if meal else None,  # Sensorzustand
+        "meal": meal,
+    }
+
+
+def week(profile, arg):
+    return {"profile": profile, "days": _week(profile)}
+
+
+def meal(profile, arg):
+    try:
+        meal_id = int(arg)
+    except (TypeError, ValueError):
+        return None
+    row, ings = db.get_meal(meal_id)
+    if row is None:
+        return None
+    return dict(_meal_summary(row), recipe=db.get_recipe(meal_id), ingredients=[i["name"] for i in ings])
+
+
+def shopping(profile, arg):
+    plan, _, _ = read_user_state(profile)
+    rows = db.get_shopping_list((plan or {}).values())
+    return {
+        "profile": profile,
+        "items": [{"name": r["name"], "count": r["count"], "meals": r["meals"]} for r in rows],
+    }
+
+
+# Endpunkt -> (Funktion, hängt vom Plan ab, hängt vom Datum ab)
+ROUTES = {
+    "today": (today, True, True),
+    "week": (week, True, False),
+    "meal": (meal, False, False),
+    "shopping": (shopping, True, False),
+}
+
+
+def _etag(profile, uses_plan, uses_date):
+    generation, external = db.data_generation()
+    parts = [_BOOT, str(generation), str(external)]
+    if uses_plan:
+        # Ab Montag gilt der Kalender der neuen Woche, auch ohne neue Version
+        parts += [str(state_version(profile)), week_start().isoformat()]
+    if uses_date:
+        parts.append(datetime.date.today().isoformat())
+    return '"' + "-".join(parts) + '"'
+
+
+def respond(method, target, headers):
+    """Beantwortet eine Anfrage; liefert ``(Status, Header, Body)``."""
+    if method not in ("GET", "HEAD"):
+        return 405, {"Allow": "GET, HEAD"}, b""
+    url = urlsplit(target)
+    parts = url.path.strip("/").split("/")
+    if len(parts) not in (2, 3) or parts[0] != "api" or parts[1] not in ROUTES:
+        return 404, {}, b""
+    handler, uses_plan, uses_date = ROUTES[parts[1]]
+    arg = parts[2] if len(parts) == 3 else None
+    profile = parse_qs(url.query).get("profile", [DEFAULT_PROFILE])[0]
+
+    etag = _etag(profile, uses_plan, uses_date)
+    response_headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag in (t.strip() for t in headers.get("if-none-match", "").split(",")):
+        return 304, response_headers, b""
+
+    key = (parts[1], arg, profile)
+    cached = _responses.get(key)
+    if cached is not None and cached[0] == etag:
+        body = cached[1]
+    else:
+        data = handler(profile, arg)
+        if data is None:
+            return 404, {}, b""
+        body = json.dumps(data, ensure_ascii=False).encode("utf-8")
+        if len(_responses) >= RESPONSE_CACHE_SIZE:
+            _responses.clear()
+        _responses[key] = (etag, body)
+    response_headers["Content-Type"] = "application/json; charset=utf-8"
+    return 200, response_headers, body
+
+
+# ---------------------------------------------------
+# HTTP/1.1 über asyncio-Streams
+# ---------------------------------------------------
+async def _handle(reader, writer):
+    try:
+        while True:
+            try:
+                head = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), KEEPALIVE_TIMEOUT)
+            except (asyncio.TimeoutError, asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+                return
+            lines = head.decode("latin-1").split("\r\n")
+            try:
+                method, target, version = lines[0].split(" ")
+            except ValueError:
+                return
+            headers = {}
+            for line in lines[1:]:
+                name, sep, value = line.partition(":")
+                if sep:
+                    headers[name.strip().lower()] = value.strip()
+
+            status, response_headers, body = respond(method, target, headers)
+            keep_alive = (
+                headers.get("connection", "").lower() != "close"
+                if version == "HTTP/1.1"
+                else headers.get("connection", "").lower() == "keep-alive"
+            )
+            response_headers["Content-Length"] = str(len(body)) if status != 304 else "0"
+            response_headers["Connection"] = "keep-alive" if keep_alive else "close"
+            out = [f"HTTP/1.1 {status} {REASONS[status]}"]
+            out.extend(f"{k}: {v}" for k, v in response_headers.items())
+            writer.write(("\r\n".join(out) + "\r\n\r\n").encode("latin-1"))
+            if method != "HEAD" and status == 200:
+                writer.write(body)
+            await writer.drain()
+            if not keep_alive:
+                return
+    except ConnectionError:
+        pass
+    except Exception:
+        log.exception("Fehler in der API-Anfrage")
+    finally:
+        writer.close()
+
+
+async def serve(host=API_HOST, port=API_PORT):
+    server = await asyncio.start_server(_handle, host, port, limit=MAX_HEADER_BYTES)
+    log.info("API lauscht auf %s:%s", host, port)
+    async with server:
+        await server.serve_forever()
+
+
+def start_in_background(host=API_HOST, port=API_PORT):
+    """Startet den Server in einem Daemon-Thread (einmal pro Prozess aufrufen)."""
+    def run():
+        try:
+            asyncio.run(serve(host, port))
+        except OSError as e:
+            log.warning("API nicht gestartet (%s:%s): %s", host, port, e)
+
+    thread = threading.Thread(target=run, name="meal-planner-api", daemon=True)
+    thread.start()
+    return thread
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="JSON-API für Home Assistant")
+    parser.add_argument("--host", default=API_HOST)
+    parser.add_argument("--port", type=int, default=API_PORT)
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO)
+    db.init_db()
+    asyncio.run(serve(args.host, args.port))
+
+
+if __name__ == "__main__":
+    main()
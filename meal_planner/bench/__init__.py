@@ -0,0 +1,10 @@
+"""Benchmarks für den Mahlzeiten-Planer.
+
+Aus dem Verzeichnis ``meal_planner`` starten::
+
+    python -m bench run --sizes 100 1000 10000 --out bench.json
+    python -m bench compare alt.json bench.json
+
+Jede Katalog-Größe läuft in einem eigenen Prozess mit eigener
+Scratch-Datenbank (``MEALS_DATA_DIR``), damit Caches und Pool frisch sind.
+"""
@@ -0,0 +1,125 @@
+import argparse
+import json
+import os
+import platform
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+
+PACKAGE_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def worker(args):
+    """Läuft im Unterprozess; MEALS_DATA_DIR zeigt bereits auf die Scratch-DB."""
+    from bench import e2e, generator, micro
+
+    start = time.perf_counter()
+    generator.populate(args.size, args.ingredients)
+    result = {
+        "populate_s": time.perf_counter() - start,
+        "micro": micro.run(args.repeat),
+    }
+    if not args.no_e2e:
+        result["e2e"] = e2e.run(max(3, args.repeat // 5))
+    with open(args.result, "w", encoding="utf-8") as f:
+        json.dump(result, f)
+
+
+def run(args):
+    report = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "machine": platform.machine(),
+            "ingredients_per_meal": args.ingredients,
+        },
+        "sizes": {},
+    }
+    for size in args.sizes:
+        with tempfile.TemporaryDirectory(prefix="meal-bench-") as scratch:
+            result_file = os.path.join(scratch, "result.json")
+            cmd = [
+                sys.executable, "-m", "bench", "worker",
+                "--size", str(size), "--ingredients", str(args.ingredients),
+                "--repeat", str(args.repeat), "--result", result_file,
+            ]
+            if args.no_e2e:
+                cmd.append("--no-e2e")
+            # Ohne JSON-API: setup() würde sonst den echten Port 8099 belegen
+            env = dict(os.environ, MEALS_DATA_DIR=scratch, MEALS_API_PORT="0")
+            print(f"… {size} Mahlzeiten", file=sys.stderr)
+            subprocess.run(cmd, cwd=PACKAGE_ROOT, env=env, check=True)
+            with open(result_file, encoding="utf-8") as f:
+                report["sizes"][str(size)] = json.load(f)
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"Ergebnisse in {args.out}", file=sys.stderr)
+
+
+def _medians(report):
+    for size, result in report["sizes"].items():
+        for group in ("micro", "e2e"):
+            for name, stats in result.get(group, {}).items():
+                if isinstance(stats, dict) and "median_ms" in stats:
+                    yield (size, group, name), stats["median_ms"]
+
+
+def compare(args):
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = dict(_medians(json.load(f)))
+    with open(args.current, encoding="utf-8") as f:
+        current = dict(_medians(json.load(f)))
+    regressions = 0
+    print(f"{'Größe':>6}  {'Messung':<34} {'alt ms':>9} {'neu ms':>9} {'Faktor':>7}")
+    for key in sorted(current, key=lambda k: (int(k[0]), k[1], k[2])):
+        if key not in baseline:
+            continue
+        old, new = baseline[key], current[key]
+        ratio = new / old if old else float("inf")
+        flag = ""
+        if ratio > args.threshold and new - old > args.min_delta_ms:
+            flag = "  ← langsamer"
+            regressions += 1
+        size, group, name = key
+        print(f"{size:>6}  {group + '.' + name:<34} {old:9.3f} {new:9.3f} {ratio:7.2f}{flag}")
+    return 1 if regressions else 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m bench", description="Benchmarks für den Mahlzeiten-Planer")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_run = sub.add_parser("run", help="Benchmarks für mehrere Katalog-Größen ausführen")
+    p_run.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000])
+    p_run.add_argument("--ingredients", type=int, default=8, help="Zutaten pro Mahlzeit")
+    p_run.add_argument("--repeat", type=int, default=50)
+    p_run.add_argument("--no-e2e", action="store_true", help="AppTest-Reruns überspringen")
+    p_run.add_argument("--out", default="bench_results.json")
+
+    p_cmp = sub.add_parser("compare", help="Zwei Ergebnisdateien vergleichen (Exit-Code 1 bei Regression)")
+    p_cmp.add_argument("baseline")
+    p_cmp.add_argument("current")
+    p_cmp.add_argument("--threshold", type=float, default=1.25, help="erlaubter Faktor (Median)")
+    p_cmp.add_argument("--min-delta-ms", type=float, default=0.05,
+                       help="kleinere absolute Abweichungen ignorieren")
+
+    p_worker = sub.add_parser("worker")  # intern, ein Unterprozess pro Größe
+    p_worker.add_argument("--size", type=int, required=True)
+    p_worker.add_argument("--ingredients", type=int, default=8)
+    p_worker.add_argument("--repeat", type=int, default=50)
+    p_worker.add_argument("--no-e2e", action="store_true")
+    p_worker.add_argument("--result", required=True)
+
+    args = parser.parse_args(argv)
+    if args.command == "run":
+        run(args)
+    elif args.command == "compare":
+        sys.exit(compare(args))
+    else:
+        worker(args)
+
+
+main()
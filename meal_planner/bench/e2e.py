@@ -0,0 +1,43 @@
+"""Rerun-Zeiten der ganzen App, headless über Streamlits AppTest."""
+import os
+import time
+
+from bench.micro import measure
+
+APP_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "run.py")
+
+
+def _rerun(at):
+    at.run()
+    if at.exception:
+        raise RuntimeError(at.exception[0].message)
+
+
+def run(repeat=10, timeout=120):
+    try:
+        from streamlit.testing.v1 import AppTest
+    except ImportError as e:
+        return {"skipped": f"streamlit nicht verfügbar: {e}"}
+
+    at = AppTest.from_file(APP_PATH, default_timeout=timeout)
+    start = time.perf_counter()
+    _rerun(at)
+    results = {"first_run": {"runs": 1, "median_ms": (time.perf_counter() - start) * 1000}}
+
+    # Wochenplan (Startansicht)
+    results["plan_view"] = measure(lambda: _rerun(at), repeat)
+
+    # Detailansicht zum ersten Gericht der Woche
+    at.session_state["detail"] = next(m for m in at.session_state["plan"].values() if m)
+    results["detail_view"] = measure(lambda: _rerun(at), repeat)
+    at.session_state["detail"] = None
+
+    # Verwaltung: Kategorien zugeklappt, dann eine Kategorie aufgeklappt
+    nav = at.sidebar.radio[1]
+    nav.set_value(nav.options[1])
+    _rerun(at)
+    results["manage_view"] = measure(lambda: _rerun(at), repeat)
+    at.toggle(key="open_Vegetarisch").set_value(True)
+    _rerun(at)
+    results["manage_view_open_category"] = measure(lambda: _rerun(at), repeat)
+    return results
@@ -0,0 +1,31 @@
+"""Synthetischer Katalog: füllt eine Scratch-Datenbank mit N Mahlzeiten."""
+import random
+
+import bulk_io
+import db
+
+# Zutaten-Vokabular; klein genug, dass sich Zutaten zwischen Gerichten überschneiden
+VOCABULARY_SIZE = 500
+RECIPE_WORDS = 80
+_WORDS = [
+    "Zwiebel", "anbraten", "köcheln", "Ofen", "würzen", "Salz", "Pfeffer", "schneiden",
+    "Minuten", "Pfanne", "Topf", "servieren", "Knoblauch", "Sahne", "Brühe", "rühren",
+]
+
+
+def iter_synthetic_meals(n_meals, n_ingredients, seed=0):
+    rng = random.Random(seed)
+    vocabulary = [f"Zutat {i}" for i in range(VOCABULARY_SIZE)]
+    for i in range(n_meals):
+        yield {
+            "name": f"Gericht {i}",
+            "category": db.CATEGORIES[i % len(db.CATEGORIES)],
+            "recipe": " ".join(rng.choices(_WORDS, k=RECIPE_WORDS)),
+            "ingredients": [f"{rng.randrange(50, 1000, 50)} g {name}" for name in rng.sample(vocabulary, n_ingredients)],
+        }
+
+
+def populate(n_meals, n_ingredients=8, seed=0):
+    """Legt Schema an und importiert den synthetischen Katalog in ``db.DB_PATH``."""
+    db.init_db()
+    return bulk_io.import_meals(iter_synthetic_meals(n_meals, n_ingredients, seed))
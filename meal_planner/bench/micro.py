@@ -0,0 +1,66 @@
+"""Micro-Benchmarks der Datenzugriffs- und Planungsfunktionen."""
+import itertools
+import random
+import statistics
+import time
+
+import db
+import pantry
+import similarity
+from plan_engine import Constraints, current_catalog, generate, reroll
+from quantities import load_matrix
+
+DAYS = ["Montag", "Dienstag", "Mittwoch", "Donnerstag", "Freitag", "Samstag", "Sonntag"]
+
+
+def measure(fn, repeat=50, setup=None):
+    """Führt ``fn`` ``repeat``-mal aus und liefert Kennzahlen in Millisekunden."""
+    timings = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    return {
+        "runs": repeat,
+        "median_ms": statistics.median(timings),
+        "p95_ms": timings[min(len(timings) - 1, int(len(timings) * 0.95))],
+        "min_ms": timings[0],
+    }
+
+
+def run(repeat=50, seed=0):
+    rng = random.Random(seed)
+    meal_ids = [m["id"] for m in db.get_meals()]
+    week = {day: rng.choice(meal_ids) for day in DAYS}
+    counter = itertools.count()
+
+    def add_meal():
+        db.add_meal(f"Bench {next(counter)}", db.CATEGORIES[0], "", ["a", "b", "c"])
+
+    def detail():
+        db.get_meal(rng.choice(meal_ids))
+
+    return {
+        "get_meals_cold": measure(db.get_meals, repeat, setup=db.bump_generation),
+        "get_meals_warm": measure(db.get_meals, repeat),
+        "get_meal_cold": measure(detail, repeat, setup=db.bump_generation),
+        "get_meal_warm": measure(lambda: db.get_meal(meal_ids[0]), repeat),
+        "get_meals_by_ids_week": measure(lambda: db.get_meals_by_ids(week.values()), repeat),
+        "reroll_day": measure(lambda: reroll(current_catalog(), week, "Mittwoch", Constraints()), repeat),
+        "generate_week": measure(lambda: generate(current_catalog(), DAYS, Constraints()), repeat),
+        "catalog_rebuild": measure(current_catalog, repeat, setup=db.bump_generation),
+        "search_meals": measure(lambda: db.search_meals("Zutat 4"), repeat),
+        "get_meals_page": measure(lambda: db.get_meals_page(db.CATEGORIES[1], None, 24), repeat),
+        "shopping_list_week": measure(lambda: db.get_shopping_list(week.values()), repeat),
+        "pantry_rank": measure(
+            lambda: pantry.current_index().rank(pantry.food_ids("Zutat 1, Zutat 7, Zutat 42, Zutat 99"), 3), repeat
+        ),
+        "similar_meals": measure(lambda: similarity.similar_meals(week["Montag"], 5), repeat),
+        "different_meals": measure(lambda: similarity.different_meals(week["Montag"], 5), repeat),
+        "quantity_totals_week": measure(lambda: load_matrix(week.values()).totals(list(week.values()), 3), repeat),
+        # zuletzt, weil es den Katalog verändert
+        "add_meal": measure(add_meal, repeat),
+    }
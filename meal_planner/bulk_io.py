@@ -0,0 +1,313 @@
+"""Massen-Import und -Export von Mahlzeiten.
+
+Formate: das alte ``meals.json`` aus planner.py, CSV und JSON Lines. Eingaben
+werden gestreamt gelesen, Ausgaben zeilenweise erzeugt.
+
+Aufruf von der Kommandozeile::
+
+    python bulk_io.py import /data/meals.json --category Vegetarisch
+    python bulk_io.py export meals.jsonl
+"""
+import argparse
+import csv
+import io
+import json
+import os
+import sys
+from itertools import groupby
+
+import db
+from units import format_ingredient, split_ingredients
+
+DEFAULT_CATEGORY = "Vegetarisch"
+# Mahlzeiten pro executemany-Block beim Import
+BATCH_SIZE = 500
+# Lesegröße beim Streamen von JSON-Dateien
+CHUNK_SIZE = 64 * 1024
+
+FORMATS = ["legacy", "csv", "jsonl"]
+CSV_FIELDS = ["name", "category", "recipe", "ingredients", "servings"]
+# Zeichen, mit denen eine JSON-Zahl weitergehen kann
+_NUMBER_CHARS = "0123456789+-.eE"
+
+
+def _text(value, field):
+    if value is not None and not isinstance(value, str):
+        raise ValueError(f"'{field}' muss ein Text sein, nicht {type(value).__name__}")
+    return value or ""
+
+
+def _record(name, category, recipe, ingredients, default_category=DEFAULT_CATEGORY, servings=None):
+    """Einheitlicher Datensatz; wirft ``ValueError`` bei falschen Typen."""
+    if isinstance(ingredients, str):
+        ingredients = split_ingredients(ingredients)  # "Salz, Pfeffer" statt Liste
+    elif not isinstance(ingredients, list):
+        raise ValueError(f"'ingredients' muss eine Liste oder ein Text sein, nicht {type(ingredients).__name__}")
+    ingredients = [_text(i, "ingredients") for i in ingredients]
+    if category not in db.CATEGORIES:
+        category = default_category
+    try:
+        servings = int(servings) if servings else db.DEFAULT_SERVINGS
+    except (ValueError, TypeError):
+        servings = db.DEFAULT_SERVINGS
+    return {
+        "name": _text(name, "name").strip(),
+        "category": category,
+        "recipe": _text(recipe, "recipe"),
+        "ingredients": [i.strip() for i in ingredients if i and i.strip()],
+        "servings": servings,
+    }
+
+
+# ---------------------------------------------------
+# Lesen
+# ---------------------------------------------------
+def _iter_json_object(fp, chunk_size=CHUNK_SIZE):
+    """Liest ein JSON-Objekt ``{key: value, ...}`` Paar für Paar, ohne die Datei ganz zu laden."""
+    decoder = json.JSONDecoder()
+    buf = ""
+    pos = 0
+    eof = False
+
+    def fill():
+        nonlocal buf, pos, eof
+        chunk = fp.read(chunk_size)
+        eof = not chunk
+        buf = buf[pos:] + chunk
+        pos = 0
+
+    def skip_ws():
+        nonlocal pos
+        while True:
+            while pos < len(buf) and buf[pos].isspace():
+                pos += 1
+            if pos < len(buf) or eof:
+                return
+            fill()
+
+    def expect(chars):
+        nonlocal pos
+        skip_ws()
+        if pos >= len(buf) or buf[pos] not in chars:
+            raise ValueError(f"Ungültiges JSON: '{chars}' erwartet")
+        pos += 1
+        return buf[pos - 1]
+
+    def value():
+        nonlocal pos
+        skip_ws()
+        while True:
+            try:
+                obj, end = decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                fill()
+                continue
+            if not eof and (end == len(buf) or buf[end] in _NUMBER_CHARS):
+                # Zahl könnte am Pufferende abgeschnitten sein ("-12." + "5e3")
+                fill()
+                continue
+            pos = end
+            return obj
+
+    fill()
+    expect("{")
+    skip_ws()
+    if buf[pos:pos + 1] == "}":
+        return
+    while True:
+        key = value()
+        if not isinstance(key, str):
+            raise ValueError("Ungültiges JSON: Schlüssel muss ein Text sein")
+        expect(":")
+        yield key, value()
+        if expect(",}") == "}":
+            return
+
+
+def iter_legacy_json(fp, category=DEFAULT_CATEGORY):
+    """Altes planner.py-Format: ``{Name: {"rezept": "..."}}``."""
+    for name, details in _iter_json_object(fp):
+        details = details if isinstance(details, dict) else {}
+        try:
+            yield _record(name, category, details.get("rezept", ""), [], category)
+        except ValueError as e:
+            raise ValueError(f"{name}: {e}") from e
+
+
+def iter_csv(fp, category=DEFAULT_CATEGORY):
+    """CSV mit den Spalten name, category, recipe, ingredients (kommagetrennt), servings."""
+    for row in csv.DictReader(fp):
+        yield _record(
+            row.get("name"), row.get("category"), row.get("recipe"),
+            split_ingredients(row.get("ingredients") or ""), category, row.get("servings")
+        )
+
+
+def iter_jsonl(fp, category=DEFAULT_CATEGORY):
+    """Ein JSON-Objekt pro Zeile mit name, category, recipe, ingredients (Liste oder Text), servings.
+
+    Fehler melden die Zeilennummer (``ValueError``).
+    """
+    for n, line in enumerate(fp, 1):
+        if not line.strip():
+            continue
+        try:
+            obj = json.loads(line)
+            if not isinstance(obj, dict):
+                raise ValueError(f"JSON-Objekt erwartet, nicht {type(obj).__name__}")
+            record = _record(
+                obj.get("name"), obj.get("category"), obj.get("recipe"),
+                obj.get("ingredients") or [], category, obj.get("servings")
+            )
+        except ValueError as e:
+            raise ValueError(f"Zeile {n}: {e}") from e
+        yield record
+
+
+READERS = {"legacy": iter_legacy_json, "csv": iter_csv, "jsonl": iter_jsonl}
+
+
+def detect_format(filename):
+    ext = os.path.splitext(filename)[1].lower()
+    if ext == ".csv":
+        return "csv"
+    if ext in (".jsonl", ".ndjson"):
+        return "jsonl"
+    return "legacy"
+
+
+def import_meals(records, batch_size=BATCH_SIZE):
+    """Importiert Mahlzeiten in einer Transaktion; vorhandene Namen werden übersprungen.
+
+    Gibt ``(importiert, übersprungen)`` zurück.
+    """
+    imported = skipped = 0
+    with db.get_db() as conn:
+        conn.execute("BEGIN IMMEDIATE")
+        seen = {row[0] for row in conn.execute("SELECT name FROM meal")}
+        batch = []
+
+        def flush():
+            if not batch:
+                return
+            conn.executemany(
+                "INSERT INTO meal (name, category, servings) VALUES (?, ?, ?)",
+                [(r["name"], r["category"], r.get("servings", db.DEFAULT_SERVINGS)) for r in batch]
+            )
+            placeholders = ",".join("?" * len(batch))
+            ids = dict(conn.execute(
+                f"SELECT name, id FROM meal WHERE name IN ({placeholders})",
+                [r["name"] for r in batch]
+            ).fetchall())
+            db.write_recipes(conn, [(ids[r["name"]], r["recipe"]) for r in batch])
+            db.insert_ingredients(conn, [(ids[r["name"]], ing) for r in batch for ing in r["ingredients"]])
+            # Volltextindex einmal pro Block, mit fertigen Zutatenlisten
+            db.fts_add(conn, ids.values())
+            batch.clear()
+
+        for record in records:
+            if not record["name"] or record["name"] in seen:
+                skipped += 1
+                continue
+            seen.add(record["name"])
+            batch.append(record)
+            imported += 1
+            if len(batch) >= batch_size:
+                flush()
+        flush()
+    db.bump_generation()
+    return imported, skipped
+
+
+# ---------------------------------------------------
+# Schreiben
+# ---------------------------------------------------
+def iter_meals():
+    """Alle Mahlzeiten mit Zutaten, gestreamt über einen einzigen Cursor."""
+    with db.get_db() as conn:
+        cur = conn.execute("""
+        SELECT m.id, m.name, m.category, r.body, r.compressed, m.servings,
+               f.name AS ingredient, i.quantity, i.unit
+        FROM meal m
+        LEFT JOIN recipe r ON r.meal_id = m.id
+        LEFT JOIN ingredient i ON i.meal_id = m.id
+        LEFT JOIN food f ON f.id = i.food_id
+        ORDER BY m.id, i.id
+        """)
+        for _, rows in groupby(cur, key=lambda r: r["id"]):
+            rows = list(rows)
+            yield {
+                "name": rows[0]["name"],
+                "category": rows[0]["category"],
+                "recipe": db.decode_recipe(rows[0]["body"], rows[0]["compressed"]) if rows[0]["body"] else "",
+                "ingredients": [
+                    format_ingredient(r["ingredient"], r["quantity"], r["unit"])
+                    for r in rows if r["ingredient"] is not None
+                ],
+                "servings": rows[0]["servings"],
+            }
+
+
+def iter_export_jsonl():
+    for meal in iter_meals():
+        yield json.dumps(meal, ensure_ascii=False) + "\n"
+
+
+def iter_export_csv():
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+
+    def drain():
+        chunk = buf.getvalue()
+        buf.seek(0)
+        buf.truncate()
+        return chunk
+
+    writer.writerow(CSV_FIELDS)
+    yield drain()
+    for meal in iter_meals():
+        writer.writerow([
+            meal["name"], meal["category"], meal["recipe"], ", ".join(meal["ingredients"]), meal["servings"]
+        ])
+        yield drain()
+
+
+WRITERS = {"jsonl": iter_export_jsonl, "csv": iter_export_csv}
+
+
+# ---------------------------------------------------
+# Kommandozeile
+# ---------------------------------------------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Mahlzeiten importieren/exportieren")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p_import = sub.add_parser("import", help="Datei in die Datenbank importieren")
+    p_import.add_argument("file")
+    p_import.add_argument("--format", choices=FORMATS, help="Standard: anhand der Dateiendung")
+    p_import.add_argument("--category", choices=db.CATEGORIES, default=DEFAULT_CATEGORY,
+                          help="Kategorie für Einträge ohne (gültige) Kategorie")
+    p_export = sub.add_parser("export", help="Datenbank in eine Datei exportieren ('-' = stdout)")
+    p_export.add_argument("file")
+    p_export.add_argument("--format", choices=list(WRITERS))
+    args = parser.parse_args(argv)
+
+    db.init_db()
+    if args.command == "import":
+        fmt = args.format or detect_format(args.file)
+        with open(args.file, "r", encoding="utf-8-sig", newline="") as fp:
+            imported, skipped = import_meals(READERS[fmt](fp, args.category))
+        print(f"{imported} importiert, {skipped} übersprungen")
+    else:
+        fmt = args.format or ("csv" if detect_format(args.file) == "csv" else "jsonl")
+        out = sys.stdout if args.file == "-" else open(args.file, "w", encoding="utf-8", newline="")
+        try:
+            out.writelines(WRITERS[fmt]())
+        finally:
+            if out is not sys.stdout:
+                out.close()
+
+
+if __name__ == "__main__":
+    main()
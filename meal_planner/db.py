@@ -0,0 +1,888 @@
+import os
+import queue
+import sqlite3
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from contextlib import contextmanager
+
+import metrics
+from units import parse_ingredient
+
+# MEALS_DATA_DIR erlaubt ein anderes Datenverzeichnis (z. B. für Benchmarks)
+DATA_DIR = os.environ.get("MEALS_DATA_DIR") or ("/data" if os.path.exists("/data") else ".")
+DB_PATH = os.path.join(DATA_DIR, "meals.db")
+
+# interne Kategorie-Keys (Labels pro Sprache stehen in run.py)
+CATEGORIES = ["Vegan", "Vegetarisch", "Fleisch"]
+
+# Anzahl der Verbindungen, die der Pool höchstens offen hält. Mehr gleichzeitige
+# Sitzungen bekommen eine zusätzliche Verbindung, die danach geschlossen wird.
+POOL_SIZE = 8
+# Größe des Statement-Caches pro Verbindung (vorbereitete Statements werden
+# wiederverwendet, solange die Verbindung im Pool lebt)
+STATEMENT_CACHE_SIZE = 128
+
+# Portionen, für die ein Rezept gilt, wenn nichts anderes eingetragen ist
+DEFAULT_SERVINGS = 4
+
+# Höchstzahl gecachter Zutatenlisten bzw. Rezepte (Detailansicht), älteste fliegen zuerst raus
+DETAIL_CACHE_SIZE = 256
+
+# Rezepte ab dieser Länge (Bytes) werden zlib-komprimiert gespeichert; 0 = nie.
+# Der Volltextindex meal_fts speichert keine eigene Textkopie (content=''),
+# sonst läge jedes Rezept dort noch einmal unkomprimiert.
+RECIPE_COMPRESS_MIN = int(os.environ.get("MEALS_RECIPE_COMPRESS_MIN", "512"))
+
+_pool = queue.LifoQueue(maxsize=POOL_SIZE)
+_last_used = time.monotonic()  # letzte ausgeliehene Verbindung (Leerlauf für maintenance.py)
+
+
+class Meal:
+    """Listenzeile eines Gerichts, ohne Rezepttext (der kommt über ``get_recipe``).
+
+    Schlanker als ``sqlite3.Row``; ``meal["name"]`` geht weiterhin.
+    """
+    __slots__ = ("id", "name", "category", "servings")
+
+    def __init__(self, id, name, category, servings):
+        self.id = id
+        self.name = name
+        self.category = category
+        self.servings = servings
+
+    def __getitem__(self, key):
+        return getattr(self, key)
+
+    def __repr__(self):
+        return f"Meal({self.id!r}, {self.name!r}, {self.category!r}, {self.servings!r})"
+
+
+# Spalten für Meal; Listenabfragen holen nur diese
+_MEAL_COLUMNS = "m.id, m.name, m.category, m.servings"
+
+
+def _meal_row(cursor, row):
+    return Meal(*row)
+
+
+def _meal_cursor(conn):
+    cur = conn.cursor()
+    cur.row_factory = _meal_row
+    return cur
+
+
+def normalize_name(name):
+    """Vergleichsschlüssel für Zutaten: Groß-/Kleinschreibung und Leerraum egal."""
+    return " ".join(name.split()).casefold()
+
+
+def _connect():
+    conn = sqlite3.connect(
+        DB_PATH,
+        timeout=5.0,
+        check_same_thread=False,  # Verbindungen wandern zwischen Streamlit-Threads
+        cached_statements=STATEMENT_CACHE_SIZE,
+        factory=metrics.TimedConnection,  # zählt und misst Anweisungen pro Rerun
+    )
+    conn.row_factory = sqlite3.Row
+    # WAL: Leser blockieren nicht hinter Schreibern (mehrere Ingress-Sitzungen)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA foreign_keys=ON")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    return conn
+
+
+@contextmanager
+def get_db(touch=True):
+    """Leiht eine Verbindung aus dem prozessweiten Pool aus.
+
+    Beim Verlassen des Blocks wird committet (bei Fehlern zurückgerollt) und
+    die Verbindung an den Pool zurückgegeben statt geschlossen. ``touch=False``
+    (Wartung) zählt nicht als Aktivität für ``idle_seconds()``.
+    """
+    global _last_used
+    if touch:
+        _last_used = time.monotonic()
+    try:
+        conn = _pool.get_nowait()
+        metrics.record_connection(new=False)
+    except queue.Empty:
+        conn = _connect()
+        metrics.record_connection(new=True)
+    try:
+        yield conn
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+    finally:
+        try:
+            _pool.put_nowait(conn)
+        except queue.Full:
+            conn.close()
+
+
+def idle_seconds():
+    """Sekunden seit der letzten Datenbankaktivität dieses Prozesses."""
+    return time.monotonic() - _last_used
+
+
+def _dedupe_meal_names(conn):
+    """Benennt doppelte Gerichte um ("Name (2)"), damit meal.name eindeutig werden kann."""
+    taken = {row[0] for row in conn.execute("SELECT name FROM meal")}
+    dupes = conn.execute(
+        "SELECT id, name FROM meal WHERE id NOT IN (SELECT min(id) FROM meal GROUP BY name) ORDER BY id"
+    ).fetchall()
+    for meal_id, name in dupes:
+        n = 2
+        while f"{name} ({n})" in taken:
+            n += 1
+        new_name = f"{name} ({n})"
+        taken.add(new_name)
+        conn.execute("UPDATE meal SET name=? WHERE id=?", (new_name, meal_id))
+
+
+def intern_foods(conn, names):
+    """Legt fehlende Lebensmittel an; gibt ``{normalize_name(Name): food.id}`` zurück."""
+    foods = {}
+    for name in names:
+        name = " ".join(name.split())
+        if name:
+            foods.setdefault(normalize_name(name), name)
+    conn.executemany(
+        "INSERT OR IGNORE INTO food (name, key) VALUES (?, ?)",
+        [(name, key) for key, name in foods.items()]
+    )
+    ids = {}
+    keys = list(foods)
+    for start in range(0, len(keys), 500):
+        part = keys[start:start + 500]
+        ids.update(conn.execute(
+            f"SELECT key, id FROM food WHERE key IN ({','.join('?' * len(part))})", part
+        ).fetchall())
+    return ids
+
+
+def insert_ingredients(conn, items):
+    """Fügt Zutaten als ``(meal_id, Text)`` ein, z. B. ``(3, "500 g Spaghetti")``.
+
+    Menge und Einheit werden aus dem Text gelesen, der Name über ``food``
+    geteilt. Läuft in der Transaktion des Aufrufers; gibt die Menge der
+    verwendeten food_ids zurück.
+    """
+    parsed = [(meal_id,) + parse_ingredient(text) for meal_id, text in items]
+    parsed = [p for p in parsed if p[1]]
+    food_ids = intern_foods(conn, (p[1] for p in parsed))
+    conn.executemany(
+        "INSERT INTO ingredient (meal_id, food_id, quantity, unit) VALUES (?, ?, ?, ?)",
+        [(meal_id, food_ids[normalize_name(name)], quantity, unit)
+         for meal_id, name, quantity, unit in parsed]
+    )
+    return set(food_ids.values())
+
+
+def _normalize_ingredients(conn):
+    """Zutaten von Freitext pro Gericht auf food + Menge/Einheit umstellen."""
+    conn.execute("""
+    CREATE TABLE food (
+        id INTEGER PRIMARY KEY,
+        name TEXT NOT NULL,
+        key TEXT NOT NULL UNIQUE
+    )""")
+    conn.execute("""
+    CREATE TABLE ingredient_new (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        meal_id INTEGER NOT NULL REFERENCES meal(id) ON DELETE CASCADE,
+        food_id INTEGER NOT NULL REFERENCES food(id),
+        quantity REAL,
+        unit TEXT
+    )""")
+    parsed = [
+        (row["id"], row["meal_id"]) + parse_ingredient(row["name"])
+        for row in conn.execute("SELECT id, meal_id, name FROM ingredient ORDER BY id")
+    ]
+    parsed = [p for p in parsed if p[2]]
+    food_ids = intern_foods(conn, (p[2] for p in parsed))
+    conn.executemany(
+        "INSERT INTO ingredient_new (id, meal_id, food_id, quantity, unit) VALUES (?, ?, ?, ?, ?)",
+        [(ing_id, meal_id, food_ids[normalize_name(name)], quantity, unit)
+         for ing_id, meal_id, name, quantity, unit in parsed]
+    )
+    # Mit der alten Tabelle verschwinden auch ihr Index und die FTS-Trigger
+    conn.execute("DROP TABLE ingredient")
+    conn.execute("ALTER TABLE ingredient_new RENAME TO ingredient")
+
+
+def encode_recipe(text):
+    """``(body, compressed)`` für die Tabelle recipe; lange Texte zlib-komprimiert."""
+    data = text.encode("utf-8")
+    if RECIPE_COMPRESS_MIN and len(data) >= RECIPE_COMPRESS_MIN:
+        packed = zlib.compress(data)
+        if len(packed) < len(data):
+            return packed, 1
+    return text, 0
+
+
+def decode_recipe(body, compressed):
+    return zlib.decompress(body).decode("utf-8") if compressed else body
+
+
+def write_recipes(conn, items):
+    """Speichert Rezepte als ``(meal_id, Text)``.
+
+    Leere Rezepte bekommen keine Zeile. Läuft in der Transaktion des
+    Aufrufers; den Volltextindex führt der Aufrufer nach (``fts_remove``/``fts_add``).
+    """
+    items = [(meal_id, text or "") for meal_id, text in items]
+    conn.executemany(
+        "INSERT OR REPLACE INTO recipe (meal_id, body, compressed) VALUES (?, ?, ?)",
+        [(meal_id,) + encode_recipe(text) for meal_id, text in items if text]
+    )
+    conn.executemany("DELETE FROM recipe WHERE meal_id=?", [(meal_id,) for meal_id, text in items if not text])
+
+
+def _fts_rows(conn, meal_ids=None):
+    """Zeilen ``(rowid, name, recipe, ingredients)`` für meal_fts, ``None`` = alle Gerichte.
+
+    Zutaten in fester Reihenfolge (ingredient.id): zum Entfernen braucht FTS5
+    genau die Werte, die beim Einfügen indiziert wurden. Nicht vorhandene
+    Gerichte fehlen im Ergebnis.
+    """
+    if meal_ids is None:
+        parts = [None]
+    else:
+        ids = list(meal_ids)
+        parts = [ids[start:start + 500] for start in range(0, len(ids), 500)]
+    rows = []
+    for part in parts:
+        where = "" if part is None else f"WHERE {{}} IN ({','.join('?' * len(part))})"
+        params = part or ()
+        ingredients = {}
+        for meal_id, name in conn.execute(f"""
+        SELECT i.meal_id, f.name FROM ingredient i JOIN food f ON f.id = i.food_id
+        {where.format("i.meal_id")} ORDER BY i.id
+        """, params):
+            ingredients.setdefault(meal_id, []).append(name)
+        rows += [
+            (meal_id, name, decode_recipe(body, compressed) if body is not None else "",
+             " ".join(ingredients.get(meal_id, ())))
+            for meal_id, name, body, compressed in conn.execute(f"""
+            SELECT m.id, m.name, r.body, r.compressed FROM meal m LEFT JOIN recipe r ON r.meal_id = m.id
+            {where.format("m.id")}
+            """, params)
+        ]
+    return rows
+
+
+def fts_add(conn, meal_ids=None):
+    """Nimmt Gerichte (nach dem Schreiben) in den Volltextindex auf."""
+    conn.executemany(
+        "INSERT INTO meal_fts (rowid, name, recipe, ingredients) VALUES (?, ?, ?, ?)", _fts_rows(conn, meal_ids)
+    )
+
+
+def fts_remove(conn, meal_ids):
+    """Nimmt Gerichte (vor dem Ändern oder Löschen) aus dem Volltextindex.
+
+    meal_fts hat keine Textkopie; der ``'delete'``-Befehl bekommt die
+    aktuellen Werte aus meal, recipe und ingredient.
+    """
+    conn.executemany(
+        "INSERT INTO meal_fts (meal_fts, rowid, name, recipe, ingredients) VALUES ('delete', ?, ?, ?, ?)",
+        _fts_rows(conn, meal_ids)
+    )
+
+
+def _contentless_fts(conn):
+    """meal_fts ohne gespeicherte Texte neu aufbauen; die Trigger entfallen."""
+    for name in ("meal_fts_ai", "meal_fts_au", "meal_fts_ad", "ingredient_fts_ai", "ingredient_fts_au",
+                 "ingredient_fts_ad"):
+        conn.execute(f"DROP TRIGGER IF EXISTS {name}")
+    conn.execute("DROP TABLE IF EXISTS meal_fts")
+    conn.execute("""
+    CREATE VIRTUAL TABLE meal_fts USING fts5(
+        name, recipe, ingredients,
+        content = '',
+        tokenize = 'unicode61 remove_diacritics 2',
+        prefix = '2 3'
+    )""")
+    fts_add(conn)
+
+
+def _split_recipes(conn):
+    """Rezepttexte aus meal in eine eigene Tabelle verschieben."""
+    conn.execute("""
+    CREATE TABLE recipe (
+        meal_id INTEGER PRIMARY KEY REFERENCES meal(id) ON DELETE CASCADE,
+        body BLOB NOT NULL,
+        compressed INTEGER NOT NULL DEFAULT 0
+    )""")
+    rows = conn.execute("SELECT id, recipe FROM meal WHERE recipe IS NOT NULL AND recipe != ''").fetchall()
+    conn.executemany(
+        "INSERT INTO recipe (meal_id, body, compressed) VALUES (?, ?, ?)",
+        [(meal_id,) + encode_recipe(text) for meal_id, text in rows]
+    )
+    # Die Trigger lesen meal.recipe; ohne sie lässt sich die Spalte entfernen
+    conn.execute("DROP TRIGGER IF EXISTS meal_fts_ai")
+    conn.execute("DROP TRIGGER IF EXISTS meal_fts_au")
+    conn.execute("ALTER TABLE meal DROP COLUMN recipe")
+
+
+# Zutatentext eines Gerichts für die Volltextsuche
+_FTS_INGREDIENTS = """
+    (SELECT coalesce(group_concat(f.name, ' '), '')
+     FROM ingredient i JOIN food f ON f.id = i.food_id WHERE i.meal_id = {})"""
+
+
+# Geordnete Schema-Migrationen: (Version, Schritte). Ein Schritt ist entweder
+# ein SQL-Statement oder eine Funktion, die die Verbindung bekommt.
+# Bestehende Einträge nie ändern, sondern neue Versionen anhängen.
+MIGRATIONS = [
+    (1, [
+        """
+        CREATE TABLE IF NOT EXISTS meal (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            category TEXT NOT NULL,
+            recipe TEXT
+        )""",
+        """
+        CREATE TABLE IF NOT EXISTS ingredient (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            meal_id INTEGER,
+            FOREIGN KEY(meal_id) REFERENCES meal(id) ON DELETE CASCADE
+        )""",
+    ]),
+    # Zutaten aufräumen, die aus der Zeit ohne foreign_keys übrig geblieben sind
+    (2, [
+        "DELETE FROM ingredient WHERE meal_id IS NULL OR meal_id NOT IN (SELECT id FROM meal)",
+    ]),
+    (3, [
+        "CREATE INDEX IF NOT EXISTS idx_ingredient_meal_id ON ingredient(meal_id)",
+        "CREATE INDEX IF NOT EXISTS idx_meal_category ON meal(category)",
+    ]),
+    (4, [
+        _dedupe_meal_names,
+        "CREATE UNIQUE INDEX IF NOT EXISTS idx_meal_name ON meal(name)",
+    ]),
+    # Volltextsuche: eine FTS5-Zeile pro Mahlzeit (rowid = meal.id), die
+    # Zutaten als ein Textfeld; Trigger halten den Index synchron
+    (5, [
+        """
+        CREATE VIRTUAL TABLE IF NOT EXISTS meal_fts USING fts5(
+            name, recipe, ingredients,
+            tokenize = 'unicode61 remove_diacritics 2',
+            prefix = '2 3'
+        )""",
+        """
+        INSERT INTO meal_fts (rowid, name, recipe, ingredients)
+        SELECT m.id, m.name, coalesce(m.recipe, ''),
+               (SELECT coalesce(group_concat(i.name, ' '), '') FROM ingredient i WHERE i.meal_id = m.id)
+        FROM meal m
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS meal_fts_ai AFTER INSERT ON meal BEGIN
+            INSERT INTO meal_fts (rowid, name, recipe, ingredients)
+            VALUES (new.id, new.name, coalesce(new.recipe, ''), '');
+        END""",
+        """
+        CREATE TRIGGER IF NOT EXISTS meal_fts_au AFTER UPDATE OF name, recipe ON meal BEGIN
+            UPDATE meal_fts SET name = new.name, recipe = coalesce(new.recipe, '')
+            WHERE rowid = new.id;
+        END""",
+        """
+        CREATE TRIGGER IF NOT EXISTS meal_fts_ad AFTER DELETE ON meal BEGIN
+            DELETE FROM meal_fts WHERE rowid = old.id;
+        END""",
+        """
+        CREATE TRIGGER IF NOT EXISTS ingredient_fts_ai AFTER INSERT ON ingredient BEGIN
+            UPDATE meal_fts SET ingredients =
+                (SELECT coalesce(group_concat(name, ' '), '') FROM ingredient WHERE meal_id = new.meal_id)
+            WHERE rowid = new.meal_id;
+        END""",
+        """
+        CREATE TRIGGER IF NOT EXISTS ingredient_fts_au AFTER UPDATE ON ingredient BEGIN
+            UPDATE meal_fts SET ingredients =
+                (SELECT coalesce(group_concat(name, ' '), '') FROM ingredient WHERE meal_id = old.meal_id)
+            WHERE rowid = old.meal_id;
+            UPDATE meal_fts SET ingredients =
+                (SELECT coalesce(group_concat(name, ' '), '') FROM ingredient WHERE meal_id = new.meal_id)
+            WHERE rowid = new.meal_id;
+        END""",
+        """
+        CREATE TRIGGER IF NOT EXISTS ingredient_fts_ad AFTER DELETE ON ingredient BEGIN
+            UPDATE meal_fts SET ingredients =
+                (SELECT coalesce(group_concat(name, ' '), '') FROM ingredient WHERE meal_id = old.meal_id)
+            WHERE rowid = old.meal_id;
+        END""",
+    ]),
+    # Wochenplan und Sprache pro Haushalt/Profil; version für optimistisches Schreiben
+    (6, [
+        """
+        CREATE TABLE IF NOT EXISTS profile_state (
+            profile TEXT PRIMARY KEY,
+            plan TEXT,
+            lang TEXT NOT NULL DEFAULT 'DE',
+            version INTEGER NOT NULL DEFAULT 0
+        )""",
+    ]),
+    # Kalender: geplante und gekochte Mahlzeiten pro Datum; week = Montag,
+    # zu dem der Wochenplan in profile_state gehört
+    (7, [
+        """
+        CREATE TABLE IF NOT EXISTS plan_entry (
+            profile TEXT NOT NULL,
+            date TEXT NOT NULL,
+            slot TEXT NOT NULL,
+            meal_id INTEGER REFERENCES meal(id) ON DELETE SET NULL,
+            PRIMARY KEY (profile, date, slot)
+        ) WITHOUT ROWID""",
+        "CREATE INDEX IF NOT EXISTS idx_plan_entry_date ON plan_entry(date)",
+        "ALTER TABLE profile_state ADD COLUMN week TEXT",
+    ]),
+    # Zutaten normalisiert: Namen einmal in food, pro Gericht Menge + Einheit;
+    # Portionen pro Rezept zum Umrechnen auf die Haushaltsgröße
+    (8, [
+        _normalize_ingredients,
+        "CREATE INDEX IF NOT EXISTS idx_ingredient_meal_id ON ingredient(meal_id)",
+        f"ALTER TABLE meal ADD COLUMN servings INTEGER NOT NULL DEFAULT {DEFAULT_SERVINGS}",
+        f"""
+        CREATE TRIGGER IF NOT EXISTS ingredient_fts_ai AFTER INSERT ON ingredient BEGIN
+            UPDATE meal_fts SET ingredients = {_FTS_INGREDIENTS.format("new.meal_id")}
+            WHERE rowid = new.meal_id;
+        END""",
+        f"""
+        CREATE TRIGGER IF NOT EXISTS ingredient_fts_au AFTER UPDATE ON ingredient BEGIN
+            UPDATE meal_fts SET ingredients = {_FTS_INGREDIENTS.format("old.meal_id")}
+            WHERE rowid = old.meal_id;
+            UPDATE meal_fts SET ingredients = {_FTS_INGREDIENTS.format("new.meal_id")}
+            WHERE rowid = new.meal_id;
+        END""",
+        f"""
+        CREATE TRIGGER IF NOT EXISTS ingredient_fts_ad AFTER DELETE ON ingredient BEGIN
+            UPDATE meal_fts SET ingredients = {_FTS_INGREDIENTS.format("old.meal_id")}
+            WHERE rowid = old.meal_id;
+        END""",
+        f"UPDATE meal_fts SET ingredients = {_FTS_INGREDIENTS.format('meal_fts.rowid')}",
+    ]),
+    (9, [
+        # MinHash-Signaturen (similarity.py), fehlende werden beim ersten Zugriff berechnet
+        """
+        CREATE TABLE IF NOT EXISTS meal_signature (
+            meal_id INTEGER PRIMARY KEY REFERENCES meal(id) ON DELETE CASCADE,
+            signature BLOB NOT NULL
+        )""",
+    ]),
+    # Rezepttext in eigener Tabelle (optional komprimiert), damit Katalog und
+    # Listen ihn nicht mitladen; meal_fts.recipe schreibt write_recipes()
+    (10, [
+        _split_recipes,
+        """
+        CREATE TRIGGER IF NOT EXISTS meal_fts_ai AFTER INSERT ON meal BEGIN
+            INSERT INTO meal_fts (rowid, name, recipe, ingredients) VALUES (new.id, new.name, '', '');
+        END""",
+        """
+        CREATE TRIGGER IF NOT EXISTS meal_fts_au AFTER UPDATE OF name ON meal BEGIN
+            UPDATE meal_fts SET name = new.name WHERE rowid = new.id;
+        END""",
+    ]),
+    # MinHash-Signaturen verfallen mit jeder Zutatenänderung, auch ohne
+    # geladenen Index (Neustart, Import, andere Prozesse); similarity.py
+    # berechnet fehlende neu. Bisher gespeicherte können veraltet sein.
+    (11, [
+        """
+        CREATE TRIGGER IF NOT EXISTS ingredient_signature_ai AFTER INSERT ON ingredient BEGIN
+            DELETE FROM meal_signature WHERE meal_id = new.meal_id;
+        END""",
+        """
+        CREATE TRIGGER IF NOT EXISTS ingredient_signature_au AFTER UPDATE OF meal_id, food_id ON ingredient BEGIN
+            DELETE FROM meal_signature WHERE meal_id IN (old.meal_id, new.meal_id);
+        END""",
+        """
+        CREATE TRIGGER IF NOT EXISTS ingredient_signature_ad AFTER DELETE ON ingredient BEGIN
+            DELETE FROM meal_signature WHERE meal_id = old.meal_id;
+        END""",
+        "DELETE FROM meal_signature",
+    ]),
+    # Volltextindex ohne Textkopie (Rezepte lagen dort unkomprimiert ein
+    # zweites Mal); Schreibfunktionen führen ihn statt Triggern nach
+    (12, [
+        _contentless_fts,
+    ]),
+]
+
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+
+def _schema_version(conn):
+    conn.execute("""
+    CREATE TABLE IF NOT EXISTS schema_version (
+        version INTEGER PRIMARY KEY,
+        applied_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+    )""")
+    return conn.execute("SELECT max(version) FROM schema_version").fetchone()[0] or 0
+
+
+def migrate(conn):
+    """Bringt das Schema in einer Transaktion auf SCHEMA_VERSION."""
+    if _schema_version(conn) >= SCHEMA_VERSION:
+        return
+    # IMMEDIATE sperrt für andere Schreiber, damit parallel startende
+    # Prozesse nicht dieselbe Migration doppelt ausführen
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        current = _schema_version(conn)
+        for version, steps in MIGRATIONS:
+            if version <= current:
+                continue
+            for step in steps:
+                if callable(step):
+                    step(conn)
+                else:
+                    conn.execute(step)
+            conn.execute("INSERT INTO schema_version (version) VALUES (?)", (version,))
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+
+
+def init_db():
+    with get_db() as conn:
+        migrate(conn)
+        c = conn.cursor()
+        c.execute("SELECT count(*) FROM meal")
+        if c.fetchone()[0] == 0:
+            c.execute("INSERT INTO meal (name, category) VALUES (?, ?)", ("Spaghetti Bolognese", "Fleisch"))
+            meal_id = c.lastrowid
+            write_recipes(conn, [(meal_id, "Ein Klassiker...")])
+            insert_ingredients(conn, [
+                (meal_id, ing) for ing in ["500 g Spaghetti", "400 g Hackfleisch", "500 ml Tomatensauce"]
+            ])
+            fts_add(conn, [meal_id])
+            conn.commit()
+            bump_generation()
+
+
+# ---------------------------------------------------
+# Katalog-Cache
+# ---------------------------------------------------
+# Prozessweit und damit für alle Sitzungen gleich. Jede Schreibfunktion erhöht
+# den Generationszähler; Cache-Einträge einer älteren Generation sind ungültig.
+_generation = 0
+_external = 0                   # erkannte Schreibvorgänge anderer Prozesse
+_known_stamp = None             # Dateistempel nach dem letzten bekannten Schreibvorgang
+_cache_lock = threading.Lock()
+_catalog = None                 # (Generation, Zeilen, {id: Zeile})
+_details = OrderedDict()        # meal_id -> Zutaten (LRU)
+_recipes = OrderedDict()        # meal_id -> Rezepttext (LRU)
+_details_generation = None
+
+
+def _file_stamp():
+    """Änderungszeit von Datenbank und WAL-Datei.
+
+    Erkennt Schreibzugriffe anderer Prozesse (z. B. CLI-Import), ohne eine
+    Abfrage abzusetzen.
+    """
+    stamp = []
+    for path in (DB_PATH, DB_PATH + "-wal"):
+        try:
+            stamp.append(os.stat(path).st_mtime_ns)
+        except OSError:
+            stamp.append(None)
+    return tuple(stamp)
+
+
+def data_generation():
+    global _known_stamp, _external
+    stamp = _file_stamp()
+    if stamp != _known_stamp:
+        with _cache_lock:
+            if stamp != _known_stamp:
+                if _known_stamp is not None:
+                    _external += 1
+                _known_stamp = stamp
+    return (_generation, _external)
+
+
+def mark_own_write():
+    """Nach eigenen Schreibvorgängen außerhalb des Katalogs (z. B. Wochenplan).
+
+    Übernimmt den neuen Dateistempel, damit der Katalog-Cache ihn nicht für
+    einen fremden Schreibzugriff hält.
+    """
+    global _known_stamp
+    with _cache_lock:
+        _known_stamp = _file_stamp()
+
+
+def bump_generation():
+    """Markiert den Katalog als geändert; gibt die neue Generation zurück."""
+    global _generation, _known_stamp
+    with _cache_lock:
+        _generation += 1
+        _known_stamp = _file_stamp()
+        return (_generation, _external)
+
+
+# Beobachter für Zutatenänderungen (z. B. der Vorrats-Index). Aufruf mit
+# (Generation nach dem Schreiben, meal_id, hinzugekommene food_ids,
+# weggefallene food_ids, Gericht gelöscht). Beim Löschen sind alle food_ids
+# des Gerichts weggefallen. Schreibwege ohne Meldung (z. B.
+# Massenimport) erhöhen nur die Generation; Beobachter bauen dann neu auf.
+_listeners = []
+
+
+def add_listener(fn):
+    _listeners.append(fn)
+
+
+def _notify(generation, meal_id, added=(), removed=(), deleted=False):
+    for fn in _listeners:
+        fn(generation, meal_id, frozenset(added), frozenset(removed), deleted)
+
+
+def _catalog_snapshot():
+    global _catalog
+    cached = _catalog
+    # Generation vor der Abfrage merken: schreibt parallel jemand, ist der
+    # Eintrag sofort veraltet und wird beim nächsten Zugriff neu geladen
+    generation = data_generation()
+    if cached is not None and cached[0] == generation:
+        return cached
+    with get_db() as conn:
+        rows = tuple(_meal_cursor(conn).execute(f"SELECT {_MEAL_COLUMNS} FROM meal m"))
+    cached = (generation, rows, {m["id"]: m for m in rows})
+    with _cache_lock:
+        _catalog = cached
+    return cached
+
+
+def _cached_details(cache, meal_ids, generation):
+    global _details_generation
+    with _cache_lock:
+        if _details_generation != generation:
+            _details.clear()
+            _recipes.clear()
+            _details_generation = generation
+        found = {}
+        for meal_id in meal_ids:
+            if meal_id in cache:
+                cache.move_to_end(meal_id)
+                found[meal_id] = cache[meal_id]
+    return found
+
+
+def _store_details(cache, items, generation):
+    with _cache_lock:
+        if _details_generation != generation:
+            return
+        cache.update(items)
+        while len(cache) > DETAIL_CACHE_SIZE:
+            cache.popitem(last=False)
+
+
+# ---------------------------------------------------
+# Lesen
+# ---------------------------------------------------
+def get_meals():
+    return _catalog_snapshot()[1]
+
+
+def get_meals_page(category, after_id=None, limit=24):
+    """Eine Seite einer Kategorie per Keyset-Paginierung (Einstieg über den Index).
+
+    ``after_id`` ist die letzte ID der vorherigen Seite; die Kosten hängen nur
+    von ``limit`` ab, nicht von der Größe des Katalogs.
+    """
+    with get_db() as conn:
+        return _meal_cursor(conn).execute(
+            f"SELECT {_MEAL_COLUMNS} FROM meal m WHERE m.category=? AND m.id>? ORDER BY m.id LIMIT ?",
+            (category, after_id or 0, limit)
+        ).fetchall()
+
+
+def get_meals_by_ids(ids, with_ingredients=False):
+    """Liefert mehrere Mahlzeiten (und optional deren Zutaten) auf einmal.
+
+    Gibt ``(meals, ings)`` zurück: ``meals`` bildet id -> Zeile ab, ``ings``
+    id -> Liste der Zutaten (leer, wenn ``with_ingredients`` nicht gesetzt ist).
+    Die Mahlzeiten kommen aus dem Katalog-Cache, fehlende Zutatenlisten werden
+    mit einer einzigen Abfrage nachgeladen.
+    """
+    ids = list(dict.fromkeys(i for i in ids if i is not None))
+    if not ids:
+        return {}, {}
+    generation, _, index = _catalog_snapshot()
+    meals = {i: index[i] for i in ids if i in index}
+    if not with_ingredients or not meals:
+        return meals, {}
+    ings = _cached_details(_details, meals, generation)
+    missing = [i for i in meals if i not in ings]
+    if missing:
+        loaded = {i: [] for i in missing}
+        placeholders = ",".join("?" * len(missing))
+        with get_db() as conn:
+            for ing in conn.execute(f"""
+                SELECT i.id, i.meal_id, i.food_id, f.name, i.quantity, i.unit
+                FROM ingredient i JOIN food f ON f.id = i.food_id
+                WHERE i.meal_id IN ({placeholders}) ORDER BY i.id
+                """, missing
+            ):
+                loaded[ing["meal_id"]].append(ing)
+        loaded = {i: tuple(rows) for i, rows in loaded.items()}
+        _store_details(_details, loaded, generation)
+        ings.update(loaded)
+    return meals, ings
+
+
+def get_meal(meal_id):
+    if meal_id is None:
+        return None, []
+    meals, ings = get_meals_by_ids([meal_id], with_ingredients=True)
+    return meals.get(meal_id), ings.get(meal_id, [])
+
+
+def get_recipe(meal_id):
+    """Rezepttext eines Gerichts; wird erst geladen, wenn ihn jemand anzeigt."""
+    generation = data_generation()
+    found = _cached_details(_recipes, [meal_id], generation)
+    if meal_id in found:
+        return found[meal_id]
+    with get_db() as conn:
+        row = conn.execute("SELECT body, compressed FROM recipe WHERE meal_id=?", (meal_id,)).fetchone()
+    text = decode_recipe(row[0], row[1]) if row else ""
+    _store_details(_recipes, {meal_id: text}, generation)
+    return text
+
+
+def _fts_query(text):
+    """Macht aus Benutzereingaben eine FTS5-Abfrage: jedes Wort als Präfix, alle müssen passen."""
+    terms = []
+    for word in text.split():
+        word = word.replace('"', '""')
+        terms.append(f'"{word}"*')
+    return " ".join(terms)
+
+
+def search_meals(text, limit=50):
+    """Volltextsuche über Name, Rezept und Zutaten, beste Treffer zuerst."""
+    query = _fts_query(text)
+    if not query:
+        return []
+    with get_db() as conn:
+        return _meal_cursor(conn).execute(f"""
+        SELECT {_MEAL_COLUMNS}
+        FROM meal_fts
+        JOIN meal m ON m.id = meal_fts.rowid
+        WHERE meal_fts MATCH ?
+        ORDER BY bm25(meal_fts, 10.0, 1.0, 4.0)
+        LIMIT ?
+        """, (query, limit)).fetchall()
+
+
+def get_shopping_list(meal_ids):
+    """Fasst die Zutaten der geplanten Mahlzeiten in einer Abfrage zusammen.
+
+    ``meal_ids`` darf Wiederholungen enthalten (dasselbe Gericht an zwei Tagen
+    zählt doppelt). Liefert Zeilen mit ``food_id``, ``name``, ``count`` und ``meals``.
+    """
+    meal_ids = [i for i in meal_ids if i is not None]
+    if not meal_ids:
+        return []
+    values = ",".join(["(?)"] * len(meal_ids))
+    with get_db() as conn:
+        return conn.execute(f"""
+        WITH week(meal_id) AS (VALUES {values})
+        SELECT f.id AS food_id,
+               f.name AS name,
+               count(*) AS count,
+               group_concat(DISTINCT m.name) AS meals
+        FROM week
+        JOIN ingredient i ON i.meal_id = week.meal_id
+        JOIN food f ON f.id = i.food_id
+        JOIN meal m ON m.id = week.meal_id
+        GROUP BY f.id
+        ORDER BY f.key
+        """, meal_ids).fetchall()
+
+
+# ---------------------------------------------------
+# Schreiben (jede Funktion erhöht die Generation)
+# ---------------------------------------------------
+def add_meal(name, category, recipe, ingredients, servings=DEFAULT_SERVINGS):
+    with get_db() as conn:
+        cur = conn.cursor()
+        cur.execute(
+            "INSERT INTO meal (name, category, servings) VALUES (?, ?, ?)",
+            (name, category, servings)
+        )
+        meal_id = cur.lastrowid
+        write_recipes(conn, [(meal_id, recipe)])
+        food_ids = insert_ingredients(conn, [(meal_id, ing) for ing in ingredients])
+        fts_add(conn, [meal_id])
+        conn.commit()
+    _notify(bump_generation(), meal_id, added=food_ids)
+
+
+def delete_meal(meal_id):
+    with get_db() as conn:
+        food_ids = [r[0] for r in conn.execute(
+            "SELECT DISTINCT food_id FROM ingredient WHERE meal_id=?", (meal_id,)
+        )]
+        fts_remove(conn, [meal_id])
+        conn.execute("DELETE FROM meal WHERE id=?", (meal_id,))
+        conn.commit()
+    _notify(bump_generation(), meal_id, removed=food_ids, deleted=True)
+
+
+def update_meal(meal_id, name, category, servings=None):
+    with get_db() as conn:
+        fts_remove(conn, [meal_id])
+        conn.execute(
+            "UPDATE meal SET name=?, category=?, servings=coalesce(?, servings) WHERE id=?",
+            (name, category, servings, meal_id)
+        )
+        fts_add(conn, [meal_id])
+        conn.commit()
+    _notify(bump_generation(), meal_id)
+
+
+def update_recipe(meal_id, recipe):
+    with get_db() as conn:
+        fts_remove(conn, [meal_id])
+        write_recipes(conn, [(meal_id, recipe)])
+        fts_add(conn, [meal_id])
+        conn.commit()
+    _notify(bump_generation(), meal_id)
+
+
+def add_ingredient(meal_id, text):
+    """Zutat mit optionaler Menge, z. B. ``"2 EL Olivenöl"``."""
+    with get_db() as conn:
+        fts_remove(conn, [meal_id])
+        food_ids = insert_ingredients(conn, [(meal_id, text)])
+        fts_add(conn, [meal_id])
+        conn.commit()
+    _notify(bump_generation(), meal_id, added=food_ids)
+
+
+def delete_ingredient(ing_id):
+    with get_db() as conn:
+        row = conn.execute("SELECT meal_id, food_id FROM ingredient WHERE id=?", (ing_id,)).fetchone()
+        if row is None:
+            return
+        fts_remove(conn, [row["meal_id"]])
+        conn.execute("DELETE FROM ingredient WHERE id=?", (ing_id,))
+        fts_add(conn, [row["meal_id"]])
+        # Dieselbe Zutat kann mehrfach am Gericht hängen (z. B. "Salz" zweimal)
+        still_there = conn.execute(
+            "SELECT 1 FROM ingredient WHERE meal_id=? AND food_id=? LIMIT 1", (row["meal_id"], row["food_id"])
+        ).fetchone()
+        conn.commit()
+    _notify(bump_generation(), row["meal_id"], removed=() if still_there else (row["food_id"],))
@@ -0,0 +1,289 @@
+"""Wartung von meals.db: Sicherungen, Aufräumen, Verdichten, Integritätsprüfung.
+
+- Sicherungen über die Online-Backup-API in ``BACKUP_DIR`` (blockweise, die
+  App schreibt währenddessen weiter), die neuesten ``BACKUP_KEEP`` bleiben
+- verwaiste Zeilen entfernen (Zutaten ohne Gericht, ungenutzte Lebensmittel …)
+- ``PRAGMA optimize``/``ANALYZE`` und inkrementelles ``VACUUM`` nur im
+  Leerlauf (``db.idle_seconds()``), damit SD-Karten nicht im Betrieb schreiben
+- Integritätsprüfung beim Start, Wiederherstellen aus einer Sicherung
+
+Aufruf von der Kommandozeile::
+
+    python maintenance.py backup
+    python maintenance.py list
+    python maintenance.py restore /data/backups/meals-20240101-030000.db
+"""
+import argparse
+import datetime
+import logging
+import os
+import sqlite3
+import threading
+import time
+from contextlib import closing
+
+import db
+
+log = logging.getLogger("meal_planner.maintenance")
+
+BACKUP_DIR = os.environ.get("MEALS_BACKUP_DIR") or os.path.join(db.DATA_DIR, "backups")
+# Anzahl aufbewahrter Sicherungen
+BACKUP_KEEP = int(os.environ.get("MEALS_BACKUP_KEEP", "7"))
+# Abstand zwischen automatischen Sicherungen (Stunden, 0 = aus)
+BACKUP_HOURS = float(os.environ.get("MEALS_BACKUP_HOURS", "24"))
+# Seiten pro Backup-Schritt; dazwischen kommen andere Verbindungen zum Zug
+BACKUP_PAGES = 256
+# Wartung erst nach so vielen Sekunden ohne Datenbankzugriff
+IDLE_AFTER = float(os.environ.get("MEALS_MAINTENANCE_IDLE", "300"))
+# Wie oft der Hintergrund-Thread nachsieht
+CHECK_INTERVAL = 60
+# ANALYZE höchstens so oft (Sekunden)
+ANALYZE_INTERVAL = 24 * 3600
+# Freie Seiten, die ein Leerlauf-Durchgang höchstens zurückgibt
+VACUUM_PAGES = 512
+# Höchstzahl gemeldeter Fehler der Integritätsprüfung
+INTEGRITY_MAX_ERRORS = 20
+
+_PREFIX = "meals-"
+_lock = threading.Lock()  # eine Wartungsaufgabe zur Zeit
+_last_analyze = None
+_tidied = None  # (Datengeneration, noch freie Seiten) nach dem letzten Aufräumen
+
+
+class MaintenanceError(ValueError):
+    pass
+
+
+# ---------------------------------------------------
+# Sicherungen
+# ---------------------------------------------------
+def list_backups():
+    """Pfade der Sicherungen, neueste zuerst."""
+    try:
+        names = os.listdir(BACKUP_DIR)
+    except FileNotFoundError:
+        return []
+    paths = [os.path.join(BACKUP_DIR, n) for n in names if n.startswith(_PREFIX) and n.endswith(".db")]
+    return sorted(paths, key=lambda p: (os.path.getmtime(p), p), reverse=True)
+
+
+def _rotate(keep=BACKUP_KEEP, protect=()):
+    for path in list_backups()[keep:]:
+        if path not in protect:
+            os.remove(path)
+
+
+def backup(keep=BACKUP_KEEP, protect=()):
+    """Schreibt eine konsistente Kopie nach ``BACKUP_DIR``; gibt den Pfad zurück."""
+    os.makedirs(BACKUP_DIR, exist_ok=True)
+    stamp = datetime.datetime.now().strftime("%Y%m%d-%H%M%S")
+    path = os.path.join(BACKUP_DIR, f"{_PREFIX}{stamp}.db")
+    n = 2
+    while os.path.exists(path):  # mehrere Sicherungen in derselben Sekunde
+        path = os.path.join(BACKUP_DIR, f"{_PREFIX}{stamp}-{n}.db")
+        n += 1
+    tmp = path + ".tmp"
+    with _lock:
+        with closing(sqlite3.connect(tmp)) as target:
+            with db.get_db(touch=False) as conn:
+                conn.backup(target, pages=BACKUP_PAGES, sleep=0.05)
+            # Eine Datei ohne -wal, damit sich die Sicherung einfach kopieren lässt
+            target.execute("PRAGMA journal_mode=DELETE")
+        os.replace(tmp, path)
+        _rotate(keep, protect=set(protect) | {path})
+    log.info("Sicherung geschrieben: %s", path)
+    return path
+
+
+def last_backup_age():
+    """Sekunden seit der neuesten Sicherung oder ``None``."""
+    backups = list_backups()
+    return time.time() - os.path.getmtime(backups[0]) if backups else None
+
+
+def restore(path):
+    """Ersetzt den Datenbankinhalt durch die Sicherung ``path``.
+
+    Der aktuelle Stand wird vorher selbst gesichert. Die Sicherung wird
+    zuerst geprüft; ältere Schemata werden danach migriert.
+    """
+    path = os.path.abspath(path)
+    problems = integrity_check(path)
+    if problems:
+        raise MaintenanceError(f"Sicherung beschädigt: {problems[0]}")
+    backup(protect=[path])
+    with _lock:
+        with closing(sqlite3.connect(path)) as source:
+            with db.get_db(touch=False) as conn:
+                source.backup(conn)
+                db.migrate(conn)
+    # Katalog, Indizes und Profil-Versionen gelten nicht mehr
+    db.bump_generation()
+    log.info("Wiederhergestellt aus %s", path)
+
+
+# ---------------------------------------------------
+# Aufräumen und Verdichten
+# ---------------------------------------------------
+_ORPHANS = {
+    "ingredient": "DELETE FROM ingredient WHERE meal_id NOT IN (SELECT id FROM meal)",
+    "food": "DELETE FROM food WHERE id NOT IN (SELECT food_id FROM ingredient)",
+    "recipe": "DELETE FROM recipe WHERE meal_id NOT IN (SELECT id FROM meal)",
+    "meal_signature": "DELETE FROM meal_signature WHERE meal_id NOT IN (SELECT id FROM meal)",
+    "plan_entry": "UPDATE plan_entry SET meal_id = NULL"
+                  " WHERE meal_id IS NOT NULL AND meal_id NOT IN (SELECT id FROM meal)",
+}
+
+
+def purge_orphans():
+    """Entfernt verwaiste Zeilen; gibt ``{Tabelle: Anzahl}`` zurück (nur > 0)."""
+    counts = {}
+    with _lock, db.get_db(touch=False) as conn:
+        for table, sql in _ORPHANS.items():
+            n = conn.execute(sql).rowcount
+            if n > 0:
+                counts[table] = n
+    if counts:
+        db.mark_own_write()
+        log.info("Verwaiste Zeilen entfernt: %s", counts)
+    return counts
+
+
+def optimize(analyze=False):
+    """Statistiken auffrischen und freie Seiten zurückgeben.
+
+    Die erste Runde stellt auf ``auto_vacuum=INCREMENTAL`` um (einmaliges
+    volles ``VACUUM``); danach gibt jede Runde höchstens ``VACUUM_PAGES``
+    freie Seiten ab. Gibt die Zahl der danach noch freien Seiten zurück.
+    """
+    global _last_analyze
+    with _lock, db.get_db(touch=False) as conn:
+        if analyze:
+            conn.execute("ANALYZE")
+            _last_analyze = time.monotonic()
+        conn.execute("PRAGMA optimize")
+        conn.commit()
+        free = conn.execute("PRAGMA freelist_count").fetchone()[0]
+        if conn.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:
+            conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+            conn.execute("VACUUM")  # nur außerhalb einer Transaktion möglich
+            free = 0
+        elif free:
+            # executescript läuft bis zum Ende durch; execute() gäbe nur eine Seite frei
+            conn.executescript(f"PRAGMA incremental_vacuum({VACUUM_PAGES})")
+            free = max(free - VACUUM_PAGES, 0)
+        # WAL-Datei kürzen, sonst wächst sie auf der SD-Karte mit
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchall()
+    db.mark_own_write()
+    return free
+
+
+# ---------------------------------------------------
+# Integrität
+# ---------------------------------------------------
+def integrity_check(path=None):
+    """Fehlermeldungen von ``integrity_check`` und ``foreign_key_check`` (leer = in Ordnung)."""
+    def check(conn):
+        rows = conn.execute(f"PRAGMA integrity_check({INTEGRITY_MAX_ERRORS})").fetchall()
+        problems = [r[0] for r in rows if r[0] != "ok"]
+        problems += [
+            f"{r[0]}: Zeile {r[1]} verweist auf fehlende Zeile in {r[2]}"
+            for r in conn.execute("PRAGMA foreign_key_check").fetchmany(INTEGRITY_MAX_ERRORS)
+        ]
+        return problems
+
+    if path is None:
+        with db.get_db(touch=False) as conn:
+            return check(conn)
+    try:
+        with closing(sqlite3.connect(f"file:{path}?mode=ro", uri=True)) as conn:
+            return check(conn)
+    except sqlite3.DatabaseError as e:
+        return [str(e)]
+
+
+def startup_check():
+    """Beim Start: Integrität prüfen und verwaiste Zeilen entfernen; gibt Probleme zurück."""
+    problems = integrity_check()
+    if problems:
+        log.error("Integritätsprüfung fehlgeschlagen: %s", "; ".join(problems))
+    else:
+        purge_orphans()
+    return problems
+
+
+# ---------------------------------------------------
+# Zeitplan
+# ---------------------------------------------------
+def tidy(analyze=False):
+    """Verwaiste Zeilen entfernen und verdichten; merkt sich den Datenstand dazu."""
+    global _tidied
+    generation = db.data_generation()
+    purge_orphans()
+    _tidied = (generation, optimize(analyze))
+
+
+def run_idle_tasks():
+    """Führt fällige Aufgaben aus, solange niemand die Datenbank benutzt.
+
+    Aufgeräumt wird nur, wenn sich die Daten seit dem letzten Durchgang
+    geändert haben, noch freie Seiten übrig sind oder ANALYZE fällig ist.
+    """
+    tasks = []
+    age = last_backup_age()
+    if BACKUP_HOURS and (age is None or age >= BACKUP_HOURS * 3600):
+        tasks.append(backup)
+    analyze = _last_analyze is None or time.monotonic() - _last_analyze >= ANALYZE_INTERVAL
+    if analyze or _tidied is None or _tidied[0] != db.data_generation() or _tidied[1]:
+        tasks.append(lambda: tidy(analyze))
+    for task in tasks:
+        if db.idle_seconds() < IDLE_AFTER:
+            return  # wieder Betrieb: beim nächsten Leerlauf weiter
+        try:
+            task()
+        except (sqlite3.Error, OSError) as e:
+            log.warning("Wartung fehlgeschlagen: %s", e)
+
+
+def start_in_background():
+    """Startet den Wartungs-Thread (einmal pro Prozess aufrufen)."""
+    def run():
+        while True:
+            time.sleep(CHECK_INTERVAL)
+            if db.idle_seconds() >= IDLE_AFTER:
+                run_idle_tasks()
+
+    thread = threading.Thread(target=run, name="meal-planner-maintenance", daemon=True)
+    thread.start()
+    return thread
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Wartung von meals.db")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("backup", help="Sicherung anlegen")
+    sub.add_parser("list", help="Sicherungen auflisten")
+    p_restore = sub.add_parser("restore", help="Aus einer Sicherung wiederherstellen")
+    p_restore.add_argument("file")
+    sub.add_parser("check", help="Integrität prüfen")
+    sub.add_parser("optimize", help="Aufräumen, ANALYZE, VACUUM")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO)
+    db.init_db()
+    if args.command == "backup":
+        print(backup())
+    elif args.command == "list":
+        print("\n".join(list_backups()))
+    elif args.command == "restore":
+        restore(args.file)
+    elif args.command == "check":
+        problems = integrity_check()
+        print("\n".join(problems) or "ok")
+        raise SystemExit(1 if problems else 0)
+    else:
+        print(purge_orphans())
+        print(optimize(analyze=True))
+
+
+if __name__ == "__main__":
+    main()
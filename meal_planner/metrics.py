@@ -0,0 +1,176 @@
+"""Messwerte pro Streamlit-Rerun: SQL-Anweisungen, Verbindungen, Abschnittszeiten.
+
+``db`` öffnet seine Verbindungen mit ``TimedConnection``; jede Anweisung wird
+dem Rerun zugeordnet, der im aktuellen Thread läuft (``begin_rerun``).
+Langsame Anweisungen landen zusätzlich im Log ``meal_planner.sql``.
+"""
+import json
+import logging
+import logging.handlers
+import os
+import sqlite3
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+# Anweisungen ab dieser Dauer gelten als langsam
+SLOW_QUERY_MS = float(os.environ.get("MEALS_SLOW_QUERY_MS", "50"))
+# Rotierende Metrikdatei: Größe pro Datei und Anzahl alter Dateien
+METRICS_MAX_BYTES = 1024 * 1024
+METRICS_BACKUPS = 3
+# Einträge, die gesammelt werden, bevor die Metrikdatei geschrieben wird
+METRICS_BUFFER = 50
+
+sql_log = logging.getLogger("meal_planner.sql")
+_metrics_log = logging.getLogger("meal_planner.metrics")
+_metrics_log.propagate = False
+
+_current = ContextVar("rerun_metrics", default=None)
+
+
+def _short(sql):
+    return " ".join(sql.split())[:160]
+
+
+class RerunMetrics:
+    __slots__ = (
+        "started", "finished", "queries", "query_ms", "connections",
+        "new_connections", "sections", "statements", "slow",
+    )
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.finished = None
+        self.queries = 0
+        self.query_ms = 0.0
+        self.connections = 0
+        self.new_connections = 0
+        self.sections = []          # (Name, ms, Anzahl SQL)
+        self.statements = Counter()  # gekürztes SQL -> Anzahl, zeigt N+1-Muster
+        self.slow = []              # (gekürztes SQL, ms)
+
+    @property
+    def elapsed_ms(self):
+        end = self.finished if self.finished is not None else time.perf_counter()
+        return (end - self.started) * 1000
+
+    def repeated(self, at_least=3):
+        return [(sql, n) for sql, n in self.statements.most_common() if n >= at_least]
+
+    def as_dict(self, aborted=False):
+        return {
+            "ts": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "total_ms": round(self.elapsed_ms, 3),
+            "queries": self.queries,
+            "query_ms": round(self.query_ms, 3),
+            "connections": self.connections,
+            "new_connections": self.new_connections,
+            "sections": {name: {"ms": round(ms, 3), "queries": q} for name, ms, q in self.sections},
+            "repeated": dict(self.repeated()),
+            "slow": [{"sql": sql, "ms": round(ms, 3)} for sql, ms in self.slow],
+            "aborted": aborted,
+        }
+
+
+def record_query(sql, seconds):
+    ms = seconds * 1000
+    m = _current.get()
+    if m is not None:
+        m.queries += 1
+        m.query_ms += ms
+        m.statements[_short(sql)] += 1
+    if ms >= SLOW_QUERY_MS:
+        sql_log.warning("Langsame SQL-Anweisung (%.1f ms): %s", ms, _short(sql))
+        if m is not None:
+            m.slow.append((_short(sql), ms))
+
+
+def record_connection(new):
+    m = _current.get()
+    if m is not None:
+        m.connections += 1
+        m.new_connections += bool(new)
+
+
+class TimedCursor(sqlite3.Cursor):
+    def execute(self, sql, parameters=()):
+        start = time.perf_counter()
+        try:
+            return super().execute(sql, parameters)
+        finally:
+            record_query(sql, time.perf_counter() - start)
+
+    def executemany(self, sql, seq_of_parameters):
+        start = time.perf_counter()
+        try:
+            return super().executemany(sql, seq_of_parameters)
+        finally:
+            record_query(sql, time.perf_counter() - start)
+
+
+class TimedConnection(sqlite3.Connection):
+    """Verbindung, deren Anweisungen gezählt und gemessen werden (bis zur ersten Zeile)."""
+
+    def cursor(self, factory=TimedCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+
+def begin_rerun(previous=None):
+    """Startet die Messung eines Reruns.
+
+    ``previous`` ist die Messung des letzten Reruns derselben Sitzung; wurde
+    sie durch ``st.rerun()``/``st.stop()`` nicht abgeschlossen, wird das hier
+    nachgeholt.
+    """
+    if previous is not None and previous.finished is None:
+        _finish(previous, aborted=True)
+    m = RerunMetrics()
+    _current.set(m)
+    return m
+
+
+def end_rerun():
+    m = _current.get()
+    if m is not None and m.finished is None:
+        _finish(m)
+    return m
+
+
+def _finish(m, aborted=False):
+    m.finished = time.perf_counter()
+    if _metrics_log.handlers:
+        _metrics_log.info(json.dumps(m.as_dict(aborted), ensure_ascii=False))
+
+
+@contextmanager
+def section(name):
+    """Misst einen Abschnitt des Skripts (Dauer und Anzahl SQL-Anweisungen)."""
+    m = _current.get()
+    start = time.perf_counter()
+    queries = m.queries if m is not None else 0
+    try:
+        yield
+    finally:
+        if m is not None:
+            m.sections.append((name, (time.perf_counter() - start) * 1000, m.queries - queries))
+
+
+def enable_file_log(path):
+    """Hängt Messwerte als JSON-Zeilen an eine rotierende Datei an (gepuffert)."""
+    if _metrics_log.handlers:
+        return
+    target = logging.handlers.RotatingFileHandler(
+        path, maxBytes=METRICS_MAX_BYTES, backupCount=METRICS_BACKUPS, encoding="utf-8", delay=True
+    )
+    target.setFormatter(logging.Formatter("%(message)s"))
+    _metrics_log.addHandler(
+        logging.handlers.MemoryHandler(METRICS_BUFFER, flushLevel=logging.CRITICAL, target=target)
+    )
+    _metrics_log.setLevel(logging.INFO)
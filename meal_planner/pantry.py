@@ -0,0 +1,129 @@
+"""Vorrat: "Was kann ich kochen?" über einen invertierten Zutaten-Index.
+
+Pro Lebensmittel (``food.id``) eine sortierte Liste der Gerichte, die es
+enthalten, dazu die Zahl verschiedener Zutaten pro Gericht. Für einen Vorrat
+werden nur die Listen der vorhandenen Zutaten gezählt; fehlend = Zutaten des
+Gerichts minus Treffer. Der Index wird einmal gebaut und über
+``db.add_listener`` bei jeder Zutatenänderung nachgeführt.
+"""
+import threading
+from array import array
+from bisect import bisect_left
+from collections import Counter
+
+import db
+from units import parse_ingredient, split_ingredients
+
+# Bei "Vorrat bevorzugen" zählen Gerichte mit höchstens so vielen fehlenden Zutaten
+PLAN_MAX_MISSING = 1
+
+
+class PantryIndex:
+    __slots__ = ("postings", "sizes", "generation")
+
+    def __init__(self, pairs, generation=None):
+        self.postings = {}  # food_id -> array("q") sortierter meal_ids
+        self.sizes = Counter()  # meal_id -> Anzahl verschiedener Zutaten
+        for meal_id, food_id in pairs:  # sortiert nach (food_id, meal_id)
+            self.postings.setdefault(food_id, array("q")).append(meal_id)
+            self.sizes[meal_id] += 1
+        self.generation = generation
+
+    def add(self, meal_id, food_id):
+        ids = self.postings.setdefault(food_id, array("q"))
+        i = bisect_left(ids, meal_id)
+        if i == len(ids) or ids[i] != meal_id:
+            ids.insert(i, meal_id)
+            self.sizes[meal_id] += 1
+
+    def remove(self, meal_id, food_id):
+        ids = self.postings.get(food_id)
+        if ids is None:
+            return
+        i = bisect_left(ids, meal_id)
+        if i < len(ids) and ids[i] == meal_id:
+            del ids[i]
+            self.sizes[meal_id] -= 1
+            if not ids:
+                del self.postings[food_id]
+
+    def drop_meal(self, meal_id, food_ids):
+        """Entfernt ein Gericht; nur die Listen seiner Zutaten ``food_ids`` werden angefasst."""
+        for food_id in food_ids:
+            self.remove(meal_id, food_id)
+        self.sizes.pop(meal_id, None)
+
+    def rank(self, food_ids, max_missing=None, limit=None):
+        """``[(meal_id, fehlend, vorhanden)]``, wenigste fehlende Zutaten zuerst."""
+        have = Counter()
+        for food_id in set(food_ids):
+            have.update(self.postings.get(food_id, ()))
+        ranked = sorted(
+            (self.sizes[meal_id] - n, -n, meal_id) for meal_id, n in have.items()
+        )
+        result = [
+            (meal_id, missing, -neg_have) for missing, neg_have, meal_id in ranked
+            if max_missing is None or missing <= max_missing
+        ]
+        return result[:limit] if limit else result
+
+
+_lock = threading.Lock()
+_index = None
+
+
+def current_index():
+    """Index zum aktuellen Datenstand; neu gebaut nur, wenn Änderungen nicht nachgeführt wurden."""
+    global _index
+    generation = db.data_generation()
+    cached = _index
+    if cached is not None and cached.generation == generation:
+        return cached
+    with db.get_db() as conn:
+        pairs = conn.execute(
+            "SELECT DISTINCT meal_id, food_id FROM ingredient ORDER BY food_id, meal_id"
+        ).fetchall()
+    cached = PantryIndex(((r[0], r[1]) for r in pairs), generation)
+    with _lock:
+        _index = cached
+    return cached
+
+
+def _on_change(generation, meal_id, added, removed, deleted):
+    with _lock:
+        index = _index
+        # Nur nachführen, wenn der Index genau den Stand vor diesem Schreibvorgang hat
+        if index is None or index.generation != (generation[0] - 1, generation[1]):
+            return
+        if deleted:
+            index.drop_meal(meal_id, removed)
+        else:
+            for food_id in added:
+                index.add(meal_id, food_id)
+            for food_id in removed:
+                index.remove(meal_id, food_id)
+        index.generation = generation
+
+
+db.add_listener(_on_change)
+
+
+def food_ids(text):
+    """food_ids zu einer kommagetrennten Vorratsliste (Mengen werden ignoriert)."""
+    keys = {db.normalize_name(parse_ingredient(part)[0]) for part in split_ingredients(text)}
+    keys.discard("")
+    if not keys:
+        return set()
+    with db.get_db() as conn:
+        rows = conn.execute(
+            f"SELECT id FROM food WHERE key IN ({','.join('?' * len(keys))})", list(keys)
+        ).fetchall()
+    return {r[0] for r in rows}
+
+
+def cookable(text, max_missing=PLAN_MAX_MISSING):
+    """meal_ids, die mit dem Vorrat bis auf ``max_missing`` Zutaten kochbar sind."""
+    ids = food_ids(text)
+    if not ids:
+        return frozenset()
+    return frozenset(meal_id for meal_id, _, _ in current_index().rank(ids, max_missing))
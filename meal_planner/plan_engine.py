@@ -0,0 +1,206 @@
+import random
+from array import array
+from collections import Counter
+from dataclasses import dataclass, field, replace
+
+import db
+
+# Versuche beim Ziehen per Zufallsindex, bevor auf eine gefilterte Liste
+# zurückgegriffen wird (nur nötig, wenn fast alles ausgeschlossen ist)
+_DRAW_ATTEMPTS = 16
+
+
+class PlanError(ValueError):
+    """Die Randbedingungen lassen sich mit dem Katalog nicht erfüllen."""
+
+
+class Catalog:
+    """Kompakter Index: Mahlzeit-IDs pro Kategorie als Integer-Arrays."""
+
+    __slots__ = ("by_category", "category_of", "generation")
+
+    def __init__(self, pairs, generation=None):
+        self.by_category = {}
+        self.category_of = {}
+        for meal_id, category in pairs:
+            self.by_category.setdefault(category, array("q")).append(meal_id)
+            self.category_of[meal_id] = category
+        self.generation = generation
+
+    def __len__(self):
+        return len(self.category_of)
+
+
+@dataclass
+class Constraints:
+    # Kategorie -> höchstens so viele Tage pro Woche (fehlt = unbegrenzt)
+    max_per_category: dict = field(default_factory=dict)
+    # keine Mahlzeit zweimal in derselben Woche
+    no_repeats: bool = True
+    # Mahlzeit-IDs, die zuletzt gekocht wurden (z. B. die letzten N Wochen)
+    recent: frozenset = frozenset()
+    # Tag -> fest eingeplante Mahlzeit-ID
+    pinned: dict = field(default_factory=dict)
+    # Tag -> {Kategorie: Gewicht}; 0 schließt die Kategorie an dem Tag aus
+    day_weights: dict = field(default_factory=dict)
+    # Mahlzeit-IDs, die bevorzugt gezogen werden (z. B. mit dem Vorrat kochbar)
+    preferred: frozenset = frozenset()
+
+
+_catalog = None
+
+
+def current_catalog():
+    """Index zum aktuellen Datenstand, wird nur nach Schreibzugriffen neu gebaut."""
+    global _catalog
+    generation = db.data_generation()
+    cached = _catalog
+    if cached is None or cached.generation != generation:
+        cached = Catalog(((m["id"], m["category"]) for m in db.get_meals()), generation)
+        _catalog = cached
+    return cached
+
+
+def _draw(ids, excluded, rng):
+    for _ in range(_DRAW_ATTEMPTS):
+        meal_id = ids[rng.randrange(len(ids))]
+        if meal_id not in excluded:
+            return meal_id
+    return rng.choice([i for i in ids if i not in excluded])
+
+
+def _unassignable(days, allowed, caps):
+    """Erster Tag, dem sich keine Kategorie zuordnen lässt, oder ``None``.
+
+    Zuordnung Tag -> Kategorie mit höchstens ``caps[cat]`` Tagen pro
+    Kategorie (augmentierende Pfade); ``allowed[day]`` sind die Kategorien,
+    die an ``day`` ein Gewicht > 0 haben.
+    """
+    slots = {cat: [] for cat in caps}
+
+    def augment(day, seen):
+        for cat in allowed[day]:
+            if cat in seen:
+                continue
+            seen.add(cat)
+            if len(slots[cat]) < caps[cat]:
+                slots[cat].append(day)
+                return True
+            for other in slots[cat]:
+                if augment(other, seen):
+                    slots[cat].remove(other)
+                    slots[cat].append(day)
+                    return True
+        return False
+
+    for day in days:
+        if not augment(day, set()):
+            return day
+    return None
+
+
+def generate(catalog, days, constraints=None, rng=random):
+    """Erzeugt einen Plan ``{Tag: Mahlzeit-ID}`` für ``days``.
+
+    Wirft ``PlanError``, wenn die Randbedingungen nicht erfüllbar sind.
+    """
+    c = constraints or Constraints()
+    if not len(catalog):
+        raise PlanError("Es sind noch keine Mahlzeiten vorhanden.")
+
+    plan = {}
+    counts = Counter()
+    for day in days:
+        meal_id = c.pinned.get(day)
+        if meal_id is not None:
+            plan[day] = meal_id
+            counts[catalog.category_of.get(meal_id)] += 1
+
+    excluded = set(c.recent)
+    if c.no_repeats:
+        excluded.update(plan.values())
+    blocked = Counter(catalog.category_of[i] for i in excluded if i in catalog.category_of)
+
+    def remaining(cat):
+        limit = c.max_per_category.get(cat)
+        return len(days) if limit is None else max(limit - counts[cat], 0)
+
+    def available(cat):
+        return len(catalog.by_category[cat]) - blocked[cat]
+
+    def caps():
+        return {
+            cat: min(remaining(cat), available(cat) if c.no_repeats else len(days)) if available(cat) > 0 else 0
+            for cat in catalog.by_category
+        }
+
+    free_days = [d for d in days if d not in plan]
+    capacity = sum(caps().values())
+    if capacity < len(free_days):
+        raise PlanError(
+            f"Nur {capacity} passende Gerichte für {len(free_days)} freie Tage "
+            "(Kategorie-Limits, Wiederholungen oder zuletzt gekochte Gerichte prüfen)."
+        )
+
+    categories = list(catalog.by_category)
+    # Erlaubte Kategorien pro Tag (Gewicht > 0), unabhängig vom Kontingent
+    allowed = {
+        day: [cat for cat in categories if c.day_weights.get(day, {}).get(cat, 1) > 0]
+        for day in free_days
+    }
+    # Gesamtzahl reicht nicht: Tage mit wenigen erlaubten Kategorien brauchen
+    # deren Kontingent, daher einmal vollständig zuordnen
+    stuck = _unassignable(free_days, allowed, caps())
+    if stuck is not None:
+        raise PlanError(f"Für {stuck} ist keine Kategorie mehr erlaubt.")
+
+    preferred = {}
+    for meal_id in c.preferred:
+        if meal_id in catalog.category_of:
+            preferred.setdefault(catalog.category_of[meal_id], []).append(meal_id)
+    for n, day in enumerate(free_days):
+        day_weights = c.day_weights.get(day, {})
+        weights = [
+            available(cat) * day_weights.get(cat, 1) if remaining(cat) > 0 and available(cat) > 0 else 0
+            for cat in categories
+        ]
+        # Nur Kategorien, nach denen die übrigen Tage noch belegbar bleiben
+        rest, left = free_days[n + 1:], caps()
+        for i, cat in enumerate(categories):
+            if weights[i]:
+                left[cat] -= 1
+                if _unassignable(rest, allowed, left) is not None:
+                    weights[i] = 0
+                left[cat] += 1
+        if not any(weights):
+            raise PlanError(f"Für {day} ist keine Kategorie mehr erlaubt.")
+        # Bevorzugte Gerichte zuerst, solange eine erlaubte Kategorie noch welche hat
+        candidates = {
+            cat: [i for i in preferred.get(cat, ()) if i not in excluded]
+            for cat, w in zip(categories, weights) if w and cat in preferred
+        }
+        preferred_weights = [w if candidates.get(cat) else 0 for cat, w in zip(categories, weights)]
+        if preferred and any(preferred_weights):
+            cat = rng.choices(categories, preferred_weights)[0]
+            meal_id = rng.choice(candidates[cat])
+        else:
+            cat = rng.choices(categories, weights)[0]
+            meal_id = _draw(catalog.by_category[cat], excluded, rng)
+        plan[day] = meal_id
+        counts[cat] += 1
+        if c.no_repeats:
+            excluded.add(meal_id)
+            blocked[cat] += 1
+
+    return {day: plan[day] for day in days}
+
+
+def reroll(catalog, plan, day, constraints=None, rng=random):
+    """Würfelt einen Tag neu; die übrigen Tage bleiben unverändert."""
+    c = constraints or Constraints()
+    pinned = {d: m for d, m in plan.items() if d != day and m is not None}
+    recent = set(c.recent)
+    if plan.get(day) is not None:
+        recent.add(plan[day])
+    new_plan = generate(catalog, list(plan), replace(c, pinned=pinned, recent=frozenset(recent)), rng)
+    return new_plan[day]
@@ -0,0 +1,141 @@
+"""Kalender der geplanten Mahlzeiten: eine Zeile pro Profil, Datum und Mahlzeit.
+
+Der laufende Wochenplan (``profile_state``) wird ab heute in ``plan_entry``
+gespiegelt; vergangene Tage bleiben so stehen, wie sie gekocht wurden. Alle
+Lesezugriffe sind eine Bereichsabfrage über den Primärschlüssel
+``(profile, date, slot)``.
+"""
+import datetime
+import random
+from collections import deque
+from dataclasses import replace
+
+import db
+from plan_engine import Constraints, PlanError, current_catalog, generate
+from translations import DAYS
+
+# Mahlzeit des Tages; weitere Slots (z. B. Mittagessen) passen ins Schema
+DEFAULT_SLOT = "Abendessen"
+
+
+def week_start(day=None):
+    """Montag der Woche von ``day`` (Standard: heute)."""
+    day = day or datetime.date.today()
+    return day - datetime.timedelta(days=day.weekday())
+
+
+def week_dates(monday):
+    """``{Wochentag (DE): Datum}`` für die Woche ab ``monday``."""
+    return {tag: monday + datetime.timedelta(days=i) for i, tag in enumerate(DAYS["DE"])}
+
+
+def read_week(conn, profile, monday, slot=DEFAULT_SLOT):
+    """Plan ``{Wochentag: Mahlzeit-ID}`` einer Kalenderwoche oder ``None``."""
+    rows = conn.execute(
+        "SELECT date, meal_id FROM plan_entry WHERE profile = ? AND slot = ? AND date >= ? AND date < ?",
+        (profile, slot, monday.isoformat(), (monday + datetime.timedelta(days=7)).isoformat())
+    ).fetchall()
+    if not rows:
+        return None
+    by_date = {r["date"]: r["meal_id"] for r in rows}
+    return {tag: by_date.get(day.isoformat()) for tag, day in week_dates(monday).items()}
+
+
+def write_week(conn, profile, monday, plan, since=None, slot=DEFAULT_SLOT):
+    """Schreibt ``{Wochentag: Mahlzeit-ID}`` ab ``since`` (Standard: heute) in den Kalender.
+
+    Läuft in der Transaktion des Aufrufers.
+    """
+    since = since or datetime.date.today()
+    conn.executemany(
+        "INSERT OR REPLACE INTO plan_entry (profile, date, slot, meal_id) VALUES (?, ?, ?, ?)",
+        [
+            (profile, day.isoformat(), slot, plan.get(tag))
+            for tag, day in week_dates(monday).items()
+            if day >= since and plan.get(tag) is not None
+        ]
+    )
+
+
+def get_entries(profile, start, end, slot=DEFAULT_SLOT):
+    """Einträge im Zeitraum ``[start, end)`` mit Gerichtname und Kategorie."""
+    with db.get_db() as conn:
+        return conn.execute("""
+        SELECT e.date, e.meal_id, m.name, m.category
+        FROM plan_entry e
+        LEFT JOIN meal m ON m.id = e.meal_id
+        WHERE e.profile = ? AND e.slot = ? AND e.date >= ? AND e.date < ?
+        ORDER BY e.date
+        """, (profile, slot, start.isoformat(), end.isoformat())).fetchall()
+
+
+def recent_meals(profile, weeks, before=None, slot=DEFAULT_SLOT):
+    """Mahlzeit-IDs der letzten ``weeks`` Wochen vor ``before`` (Standard: dieser Montag)."""
+    if weeks <= 0:
+        return frozenset()
+    before = before or week_start()
+    with db.get_db() as conn:
+        rows = conn.execute(
+            "SELECT DISTINCT meal_id FROM plan_entry"
+            " WHERE profile = ? AND slot = ? AND date >= ? AND date < ? AND meal_id IS NOT NULL",
+            (profile, slot, (before - datetime.timedelta(weeks=weeks)).isoformat(), before.isoformat())
+        ).fetchall()
+    return frozenset(r[0] for r in rows)
+
+
+def generate_weeks(profile, start, n_weeks, constraints=None, recent_weeks=0,
+                   slot=DEFAULT_SLOT, rng=random):
+    """Plant ``n_weeks`` Wochen ab dem Montag ``start`` in einer Transaktion.
+
+    Schon eingetragene Tage bleiben erhalten. Mit ``recent_weeks`` werden
+    Gerichte der jeweils letzten Wochen ausgeschlossen; die Grundlage dafür
+    kommt aus einer einzigen Bereichsabfrage. Reicht der Katalog dafür nicht,
+    wird die betreffende Woche ohne diesen Ausschluss (notfalls mit
+    Wiederholungen) geplant.
+    Gibt die Anzahl neu geplanter Tage zurück.
+    """
+    c = constraints or Constraints()
+    catalog = current_catalog()
+    end = start + datetime.timedelta(weeks=n_weeks)
+    history_start = start - datetime.timedelta(weeks=recent_weeks)
+    with db.get_db() as conn:
+        conn.execute("BEGIN IMMEDIATE")
+        rows = conn.execute(
+            "SELECT date, meal_id FROM plan_entry WHERE profile = ? AND slot = ? AND date >= ? AND date < ?",
+            (profile, slot, history_start.isoformat(), end.isoformat())
+        ).fetchall()
+        planned = {r["date"]: r["meal_id"] for r in rows}
+
+        # Gleitendes Fenster der Mahlzeiten der letzten ``recent_weeks`` Wochen
+        window = deque(maxlen=recent_weeks or None)
+        for w in range(recent_weeks):
+            monday = history_start + datetime.timedelta(weeks=w)
+            window.append({planned.get(d.isoformat()) for d in week_dates(monday).values()} - {None})
+
+        new_rows = []
+        for w in range(n_weeks):
+            dates = [d.isoformat() for d in week_dates(start + datetime.timedelta(weeks=w)).values()]
+            pinned = {d: planned[d] for d in dates if planned.get(d) is not None}
+            week_constraints = replace(
+                c, pinned=pinned,
+                recent=c.recent.union(*window) if recent_weeks else c.recent,
+            )
+            # Erst ohne Ausschluss der letzten Wochen, dann mit Wiederholungen
+            attempts = [week_constraints, replace(week_constraints, recent=c.recent)]
+            if c.no_repeats:
+                attempts.append(replace(week_constraints, recent=c.recent, no_repeats=False))
+            for i, attempt in enumerate(attempts):
+                try:
+                    plan = generate(catalog, dates, attempt, rng)
+                    break
+                except PlanError:
+                    if i == len(attempts) - 1:
+                        raise
+            new_rows.extend((profile, d, slot, plan[d]) for d in dates if d not in pinned)
+            if recent_weeks:
+                window.append(set(plan.values()))
+        conn.executemany(
+            "INSERT OR REPLACE INTO plan_entry (profile, date, slot, meal_id) VALUES (?, ?, ?, ?)", new_rows
+        )
+    db.mark_own_write()
+    return len(new_rows)
@@ -1,8 +1,9 @@
 import streamlit as st
-import random
 import json
 import os
 
+from plan_engine import Catalog, Constraints, PlanError, generate, reroll
+
 # ------------------------------
 # Pfad für persistente Daten
 # ------------------------------
@@ -31,6 +32,11 @@ if "meals" not in st.session_state:
 if "plan" not in st.session_state:
     st.session_state.plan = {}
 
+def meal_catalog():
+    """Planer-Index über die Mahlzeiten (IDs = Position in der Namensliste)."""
+    names = list(st.session_state.meals.keys())
+    return names, Catalog((i, None) for i in range(len(names)))
+
 days = ["Montag", "Dienstag", "Mittwoch", "Donnerstag", "Freitag", "Samstag", "Sonntag"]
 
 st.title("🍽️ Wochen-Mahlzeiten-Planer")
@@ -63,10 +69,13 @@ for meal, details in st.session_state.meals.items():
 # ---------------------------------------------------
 if st.button("🎲 Wochenplan generieren"):
     if st.session_state.meals:
-        chosen = random.sample(list(st.session_state.meals.keys()), k=min(len(days), len(st.session_state.meals)))
-        while len(chosen) < len(days):
-            chosen.append(random.choice(list(st.session_state.meals.keys())))
-        st.session_state.plan = {day: meal for day, meal in zip(days, chosen)}
+        names, catalog = meal_catalog()
+        try:
+            chosen = generate(catalog, days)
+        except PlanError:
+            # weniger Mahlzeiten als Tage: Wiederholungen erlauben
+            chosen = generate(catalog, days, Constraints(no_repeats=False))
+        st.session_state.plan = {day: names[i] for day, i in chosen.items()}
     else:
         st.warning("Bitte zuerst Mahlzeiten hinzufügen!")
 
@@ -81,4 +90,9 @@ if st.session_state.plan:
             st.write(f"**{day}**: {meal}")
         with col2:
             if st.button("🔄 Neu würfeln", key=f"reroll_{day}"):
-                st.session_state.plan[day] = random.choice(list(st.session_state.meals.keys()))
+                names, catalog = meal_catalog()
+                current = {d: names.index(m) if m in names else None for d, m in st.session_state.plan.items()}
+                try:
+                    st.session_state.plan[day] = names[reroll(catalog, current, day, Constraints(no_repeats=False))]
+                except PlanError:
+                    pass  # nur eine Mahlzeit vorhanden
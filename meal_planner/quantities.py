@@ -0,0 +1,91 @@
+"""Mengenmatrix (Gerichte × Zutaten) für Einkaufslisten mit Haushaltsgröße.
+
+Eine Zeile pro Gericht, eine Spalte pro (Lebensmittel, Grundeinheit); die
+Werte sind Mengen für die Portionenzahl des Rezepts. Umrechnen auf die
+Haushaltsgröße und Aufsummieren der Woche ist damit ein Vektor-Matrix-Produkt.
+"""
+import numpy as np
+
+import db
+from units import to_base
+
+# Haushaltsgröße, wenn nichts eingestellt ist
+DEFAULT_HOUSEHOLD = 2
+
+
+class QuantityMatrix:
+    __slots__ = ("meal_index", "servings", "columns", "values", "generation")
+
+    def __init__(self, meal_ids, servings, columns, values, generation=None):
+        self.meal_index = {meal_id: row for row, meal_id in enumerate(meal_ids)}
+        self.servings = servings    # float64, Portionen pro Zeile
+        self.columns = columns      # [(food_id, Grundeinheit)]
+        self.values = values        # float64, Zeilen × Spalten
+        self.generation = generation
+
+    def totals(self, meal_ids, household):
+        """Summen pro Spalte für die geplanten Gerichte (Wiederholungen zählen mehrfach)."""
+        rows = [self.meal_index[i] for i in meal_ids if i in self.meal_index]
+        counts = np.bincount(np.asarray(rows, dtype=np.intp), minlength=len(self.servings))
+        return (counts * (household / self.servings)) @ self.values
+
+
+def load_matrix(meal_ids):
+    """Baut die Matrix für ``meal_ids`` aus einer einzigen Abfrage."""
+    generation = db.data_generation()
+    meal_ids = sorted({i for i in meal_ids if i is not None})
+    if not meal_ids:
+        return QuantityMatrix([], np.ones(0), [], np.zeros((0, 0)), generation)
+    placeholders = ",".join("?" * len(meal_ids))
+    with db.get_db() as conn:
+        rows = conn.execute(f"""
+        SELECT i.meal_id, i.food_id, i.quantity, i.unit
+        FROM ingredient i
+        WHERE i.meal_id IN ({placeholders}) AND i.quantity IS NOT NULL
+        """, meal_ids).fetchall()
+        servings = conn.execute(
+            f"SELECT id, servings FROM meal WHERE id IN ({placeholders})", meal_ids
+        ).fetchall()
+
+    index = {meal_id: row for row, meal_id in enumerate(meal_ids)}
+    column_index = {}
+    row_idx = np.empty(len(rows), dtype=np.intp)
+    col_idx = np.empty(len(rows), dtype=np.intp)
+    amounts = np.empty(len(rows))
+    for n, r in enumerate(rows):
+        quantity, base = to_base(r["quantity"], r["unit"])
+        row_idx[n] = index[r["meal_id"]]
+        col_idx[n] = column_index.setdefault((r["food_id"], base), len(column_index))
+        amounts[n] = quantity
+    values = np.zeros((len(meal_ids), len(column_index)))
+    np.add.at(values, (row_idx, col_idx), amounts)
+
+    per_meal = np.full(len(meal_ids), float(db.DEFAULT_SERVINGS))
+    for r in servings:
+        per_meal[index[r["id"]]] = max(r["servings"] or db.DEFAULT_SERVINGS, 1)
+    return QuantityMatrix(meal_ids, per_meal, list(column_index), values, generation)
+
+
+_matrix = None
+
+
+def week_matrix(meal_ids):
+    """Matrix für die Gerichte der Woche; neu gebaut nur nach Änderungen."""
+    global _matrix
+    cached = _matrix
+    wanted = {i for i in meal_ids if i is not None}
+    if cached is None or cached.generation != db.data_generation() or not wanted <= cached.meal_index.keys():
+        cached = load_matrix(wanted)
+        _matrix = cached
+    return cached
+
+
+def shopping_amounts(meal_ids, household=DEFAULT_HOUSEHOLD):
+    """``{food_id: [(Menge, Grundeinheit), ...]}`` für die Woche, auf ``household`` Personen."""
+    meal_ids = list(meal_ids)
+    matrix = week_matrix(meal_ids)
+    amounts = {}
+    for (food_id, unit), total in zip(matrix.columns, matrix.totals(meal_ids, household)):
+        if total > 0:
+            amounts.setdefault(food_id, []).append((float(total), unit))
+    return amounts
@@ -1,446 +1,108 @@
 import streamlit as st
-import sqlite3
 import os
-import random
 
-DB_PATH = "/data/meals.db" if os.path.exists("/data") else "meals.db"
-STATE_FILE = "user_state.json"  # JSON-Datei, die Sprache und Wochenplan speichert
-
-def get_db():
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
-    return conn
-
-def init_db():
-    conn = get_db()
-    c = conn.cursor()
-    c.execute("""
-    CREATE TABLE IF NOT EXISTS meal (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        name TEXT NOT NULL,
-        category TEXT NOT NULL,
-        recipe TEXT
-    )""")
-    c.execute("""
-    CREATE TABLE IF NOT EXISTS ingredient (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        name TEXT NOT NULL,
-        meal_id INTEGER,
-        FOREIGN KEY(meal_id) REFERENCES meal(id) ON DELETE CASCADE
-    )""")
-    conn.commit()
-    c.execute("SELECT count(*) FROM meal")
-    if c.fetchone()[0] == 0:
-        c.execute(
-            "INSERT INTO meal (name, category, recipe) VALUES (?, ?, ?)",
-            ("Spaghetti Bolognese", "Fleisch", "Ein Klassiker...")
-        )
-        meal_id = c.lastrowid
-        for ing in ["Spaghetti", "Hackfleisch", "Tomatensauce"]:
-            c.execute(
-                "INSERT INTO ingredient (name, meal_id) VALUES (?, ?)",
-                (ing, meal_id)
-            )
-        conn.commit()
-    conn.close()
-
-init_db()
-
-# interne Keys
-CATEGORIES = ["Vegan", "Vegetarisch", "Fleisch"]
-
-# Labels pro Sprache
-CATEGORY_LABELS = {
-"Vegan": {"DE": "Vegan", "EN": "Vegan"},
-"Vegetarisch": {"DE": "Vegetarisch", "EN": "Vegetarian"},
-"Fleisch": {"DE": "Fleisch", "EN": "Meat"},
-}
-# Wochentage
-DAYS = {
-"DE": ["Montag", "Dienstag", "Mittwoch", "Donnerstag", "Freitag", "Samstag", "Sonntag"],
-"EN": ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
-}
-
-# UI-Labels & Übersetzungen
-UI = {
-    "lang_radio":    {"DE": "Sprache",                           "EN": "Language"},
-    "plan_title":    {"DE": "🗓️ Wochen-Mahlzeiten-Planer",       "EN": "🗓️ Weekly Meal Planner"},
-    "plan_header":   {"DE": "## Dein Wochenplan",               "EN": "## Your Weekly Plan"},
-    "reroll":        {"DE": "🔄 Neu würfeln",                   "EN": "🔄 Reroll"},
-    "reroll_help":   {"DE": "Neu würfeln",                      "EN": "Reroll this day"},
-    "details":       {"DE": "ℹ️ Details",                       "EN": "ℹ️ Details"},
-    "delete":        {"DE": "🗑️ Löschen",                       "EN": "🗑️ Delete"},
-    "reroll_week":   {"DE": "Woche komplett neu würfeln",       "EN": "Reroll entire week"},
-    "manage_title":  {"DE": "🍽️ Mahlzeiten verwalten",         "EN": "🍽️ Manage Meals"},
-    "manage_desc":   {"DE": "Lege neue Gerichte an, bearbeite oder lösche bestehende.",
-                      "EN": "Add, edit or delete meals."},
-    "new_meal":      {"DE": "➕ Neue Mahlzeit hinzufügen",      "EN": "➕ Add New Meal"},
-    "form_name":     {"DE": "Gericht",                         "EN": "Meal name"},
-    "form_category": {"DE": "Kategorie",                       "EN": "Category"},
-    "form_recipe":   {"DE": "Rezept",                          "EN": "Recipe"},
-    "form_ings":     {"DE": "Zutaten (Kommagetrennt)",         "EN": "Ingredients (comma separated)"},
-    "add_button":    {"DE": "✔️ Anlegen",                      "EN": "✔️ Create"},
-    "success_add":   {"DE": "Mahlzeit gespeichert!",           "EN": "Meal saved!"},
-    "tip":           {"DE": "**Tipp:** Neue Gerichte kannst du im Menü 'Mahlzeiten verwalten' anlegen.",
-                      "EN": "**Tip:** You can add new meals under 'Manage Meals'."},
-    "back":          {"DE": "⬅️ Zurück",                        "EN": "⬅️ Back"},
-    "no_exist":      {"DE": "Dieses Gericht existiert nicht mehr.","EN": "This meal no longer exists."},
-}
-
-# Farben pro Kategorie
-CATEGORY_COLORS = {
-    "Vegan":      "#27ae60",
-    "Vegetarisch":"#f1c40f",
-    "Fleisch":    "#c0392b"
-}
-
-def get_meals():
-    with get_db() as conn:
-        return conn.execute("SELECT * FROM meal").fetchall()
-
-def get_meal(meal_id):
-    if meal_id is None:
-        return None, []
-    with get_db() as conn:
-        meal = conn.execute("SELECT * FROM meal WHERE id=?", (meal_id,)).fetchone()
-        ings = conn.execute("SELECT * FROM ingredient WHERE meal_id=?", (meal_id,)).fetchall()
-    return meal, ings
-
-def add_meal(name, category, recipe, ingredients):
-    with get_db() as conn:
-        cur = conn.cursor()
-        cur.execute(
-            "INSERT INTO meal (name, category, recipe) VALUES (?, ?, ?)",
-            (name, category, recipe)
-        )
-        meal_id = cur.lastrowid
-        for ing in ingredients:
-            if ing.strip():
-                cur.execute(
-                    "INSERT INTO ingredient (name, meal_id) VALUES (?, ?)",
-                    (ing.strip(), meal_id)
-                )
-        conn.commit()
-
-def delete_meal(meal_id):
-    with get_db() as conn:
-        conn.execute("DELETE FROM meal WHERE id=?", (meal_id,))
-        conn.commit()
-
-def update_recipe(meal_id, recipe):
-    with get_db() as conn:
-        conn.execute("UPDATE meal SET recipe=? WHERE id=?", (recipe, meal_id))
-        conn.commit()
-
-def add_ingredient(meal_id, name):
-    with get_db() as conn:
-        conn.execute(
-            "INSERT INTO ingredient (name, meal_id) VALUES (?, ?)",
-            (name, meal_id)
-        )
-        conn.commit()
-
-def delete_ingredient(ing_id):
-    with get_db() as conn:
-        conn.execute("DELETE FROM ingredient WHERE id=?", (ing_id,))
-        conn.commit()
-
-import json
-import os
-
-def save_user_state(plan, lang):
-    state = {
-        "plan": plan,
-        "lang": lang
-    }
-    with open(STATE_FILE, "w", encoding="utf-8") as f:
-        json.dump(state, f)
-
-def load_user_state():
-    if os.path.exists(STATE_FILE):
-        with open(STATE_FILE, "r", encoding="utf-8") as f:
-            state = json.load(f)
-            return state.get("plan"), state.get("lang", "DE")
-    return None, "DE"
-
-# 1️⃣ Session State initialisieren
-if "view" not in st.session_state:
-    st.session_state.view = "plan"
-if "detail" not in st.session_state:
-    st.session_state.detail = None
-
-# Plan + Sprache persistent laden
-if "plan" not in st.session_state or "lang" not in st.session_state:
-    plan, lang = load_user_state()
-    st.session_state.plan = plan or None
-    st.session_state.lang = lang or "DE"
-
-# 2️⃣ Sidebar: Sprache auswählen
-lang = st.sidebar.radio(
-    UI["lang_radio"][st.session_state.lang],
-    options=["DE", "EN"],
-    index=0 if st.session_state.lang == "DE" else 1,
-    key="lang"
-)
-save_user_state(st.session_state.plan, st.session_state.lang)
-
-# 3️⃣ Woche initialisieren (nur einmal, für beide Sprachen)
-if st.session_state.plan is None:
-    meals = get_meals()
-    st.session_state.plan = {
-        tag: (meals and random.choice(meals)["id"]) or None
-        for tag in DAYS["DE"]  # interne Schlüssel immer DE
-    }
-
-# Dünneres CSS-Upgrade
-st.markdown("""
-    <style>
-    .meal-card {
-      color: #fff;
-      padding: 0.25rem 0.5rem;
-      margin-bottom: 0.25rem;
-      border-radius: 6px;
-      box-shadow: 0 1px 3px rgba(0,0,0,0.15);
-      font-size: 0.85rem;
-    }
-    .stButton > button {
-      padding: 0.2rem 0.4rem;
-      margin: 0.1rem;
-      font-size: 0.7rem;
-      border-radius: 6px;
-      background-color: #444;
-      color: #fff;
-      border: none;
-    }
-    .stButton > button:hover {
-      background-color: #555;
+import metrics
+import services
+from db import DATA_DIR
+from translations import LANGS, UI
+from user_state import DEFAULT_PROFILE
+from views import debug, detail, history, manage, pantry, plan, shopping
+from views.common import inject_css, load_state, sync_state, watch_state
+
+# Messung dieses Reruns (Abfragen, Verbindungen, Abschnittszeiten)
+rerun_metrics = metrics.begin_rerun(st.session_state.get("rerun_metrics"))
+st.session_state.rerun_metrics = rerun_metrics
+
+
+@st.cache_resource
+def setup():
+    """Einmal pro Prozess: Metrikdatei; Schema, JSON-API und Wartung über ``services``.
+
+    Unter ``start.py`` laufen die Dienste schon seit dem Start, sonst
+    startet sie erst die erste Sitzung. Gibt die Fehler der
+    Integritätsprüfung zurück (leer = in Ordnung).
+    """
+    metrics.enable_file_log(os.path.join(DATA_DIR, "metrics.jsonl"))
+    return services.start()
+
+
+with metrics.section("init_db"):
+    integrity_problems = setup()
+
+with metrics.section("state"):
+    # 1️⃣ Session State initialisieren
+    if "view" not in st.session_state:
+        st.session_state.view = "plan"
+    if "detail" not in st.session_state:
+        st.session_state.detail = None
+    if "pinned" not in st.session_state:
+        st.session_state.pinned = set()
+    if "plan_rules" not in st.session_state:
+        st.session_state.plan_rules = {"max_per_category": {}, "no_repeats": True, "recent_weeks": 0, "use_pantry": False}
+    if "plan_error" not in st.session_state:
+        st.session_state.plan_error = None
+    if "plan_relaxed" not in st.session_state:
+        st.session_state.plan_relaxed = None  # Regeln gelockert: Grund als Hinweis
+    # Vorrat als kommagetrennte Liste (Widget-Key der Vorratsansicht). Neu
+    # zuweisen, sonst räumt Streamlit den Wert weg, solange die Ansicht nicht
+    # angezeigt wird; die Planung braucht ihn aber auch dann.
+    st.session_state.pantry = st.session_state.get("pantry", "")
+    if "page_cursors" not in st.session_state:
+        st.session_state.page_cursors = {}  # Kategorie -> Start-IDs der bisher geblätterten Seiten
+
+    # Plan + Sprache des Haushalts/Profils (?profile=… in der URL)
+    profile = st.query_params.get("profile", DEFAULT_PROFILE)
+    if st.session_state.get("profile") != profile:
+        st.session_state.profile = profile
+        load_state()
+    else:
+        sync_state()
+
+with metrics.section("plan_init"):
+    # 2️⃣ Woche initialisieren (nur einmal, für beide Sprachen)
+    plan.init_plan()
+
+with metrics.section("sidebar"):
+    if st.session_state.pop("state_conflict", False):
+        st.toast(UI["state_conflict"][st.session_state.lang])
+
+    # 3️⃣ Sidebar: Sprache auswählen
+    lang = st.sidebar.radio(
+        UI["lang_radio"][st.session_state.lang],
+        options=["DE", "EN"],
+        key="lang"  # Wert kommt aus dem Session State (Profil)
+    )
+    if integrity_problems:
+        st.sidebar.error(UI["integrity_error"][lang])
+    watch_state()  # übernimmt Änderungen anderer Geräte ohne Neuladen der Seite
+
+    inject_css()
+
+    # Navigation
+    st.sidebar.title(LANGS[lang]["nav_header"])
+    pages = {
+        "🗓️ " + UI["plan_title"][lang]: "plan",
+        UI["manage_title"][lang]: "manage",
+        UI["shopping_title"][lang]: "shopping",
+        UI["history_title"][lang]: "history",
+        UI["pantry_title"][lang]: "pantry",
     }
-    </style>
-""", unsafe_allow_html=True)
+    choice = st.sidebar.radio(LANGS[lang]["nav_sub"], list(pages.keys()))
+    st.session_state.view = pages[choice]
 
-# Navigation
-st.sidebar.title(UI["manage_title"][lang])
-pages = {
-    "🗓️ " + UI["plan_title"][lang]: "plan",
-    UI["manage_title"][lang]: "manage"
+# Aktive Ansicht
+views = {"plan": plan, "manage": manage, "shopping": shopping, "history": history, "pantry": pantry}
+sections = {
+    "plan": "plan_grid", "manage": "manage_list", "shopping": "shopping", "history": "history", "pantry": "pantry",
 }
-choice = st.sidebar.radio("", list(pages.keys()))
-st.session_state.view = pages[choice]
-
-# Hilfsfunktionen
-def reroll_day(day):
-    meals = get_meals()
-    current = st.session_state.plan.get(day)
-    options = [m for m in meals if m["id"] != current]
-    if options:
-        st.session_state.plan[day] = random.choice(options)["id"]
-    save_user_state(st.session_state.plan, st.session_state.lang)  # ← neu
-    st.rerun()
-
-def delete_and_refresh(meal_id):
-    delete_meal(meal_id)
-    st.rerun()
-
-def show_meal_detail(meal_id):
-    st.session_state.detail = meal_id
-    st.rerun()
-
-def update_meal(meal_id, name, category):
-    with get_db() as conn:
-        conn.execute(
-            "UPDATE meal SET name=?, category=? WHERE id=?",
-            (name, category, meal_id)
-        )
-        conn.commit()
-
-# Wochenplan
-if st.session_state.view == "plan":
-    st.title(UI["plan_title"][lang])
-    st.markdown(UI["plan_header"][lang])
-
-    # Spalten für die 7 Wochentage
-    cols = st.columns(7)
-    for i, tag_de in enumerate(DAYS["DE"]):  # interne Schlüssel immer DE
-        meal_id = st.session_state.plan.get(tag_de)
-        tag_display = DAYS[lang][i]           # Übersetzt für UI
-        meal, _ = get_meal(meal_id)
-
-        with cols[i]:
-            st.markdown(f"**{tag_display}**", unsafe_allow_html=True)
-            if meal:
-                color = CATEGORY_COLORS.get(meal["category"], "#333")
-                st.markdown(f"<div class='meal-card' style='background:{color}'>", unsafe_allow_html=True)
-                st.write(meal["name"])
-                if st.button(UI["details"][lang], key=f"detail_{tag_de}"):
-                    show_meal_detail(meal_id)
-                if st.button(UI["reroll"][lang], key=f"reroll_{tag_de}", help=UI["reroll_help"][lang]):
-                    reroll_day(tag_de)
-                st.markdown("</div>", unsafe_allow_html=True)
-            else:
-                st.markdown("<div class='meal-card' style='background:#555'><i>–</i></div>", unsafe_allow_html=True)
-
-    # Ganze Woche neu würfeln
-    if st.button(UI["reroll_week"][lang]):
-        meals = get_meals()
-        st.session_state.plan = {
-            tag: (meals and random.choice(meals)["id"]) or None
-            for tag in DAYS["DE"]
-        }
-        save_user_state(st.session_state.plan, st.session_state.lang)
-        st.rerun()
-
-    st.divider()
-    st.markdown(UI["tip"][lang])
-
-# Mahlzeiten verwalten
-elif st.session_state.view == "manage":
-    st.title(UI["manage_title"][lang])
-    st.markdown(UI["manage_desc"][lang])
-
-    # Neue Mahlzeit hinzufügen
-    with st.expander(UI["new_meal"][lang]):
-        with st.form("add_meal_form"):
-            name = st.text_input(UI["form_name"][lang], key="add_name")
-            category = st.selectbox(
-                UI["form_category"][lang],
-                options=CATEGORIES,
-                format_func=lambda c: CATEGORY_LABELS.get(c, {"DE": c, "EN": c})[lang]
-            )
-            recipe = st.text_area(UI["form_recipe"][lang], key="add_recipe")
-            ingredients = st.text_input(UI["form_ings"][lang], key="add_ings")
-            submitted = st.form_submit_button(UI["add_button"][lang])
-            if submitted and name and category:
-                add_meal(name, category, recipe, ingredients.split(","))
-                st.success(UI["success_add"][lang])
-                st.rerun()
-
-    # Alle Mahlzeiten anzeigen
-    meals = get_meals()
-    for cat in CATEGORIES:
-        color = CATEGORY_COLORS.get(cat, "#333")
-        st.markdown(
-            f"<h3 class='category-header' style='color:{color}'>{CATEGORY_LABELS.get(cat, {'DE':cat,'EN':cat})[lang]}</h3>",
-            unsafe_allow_html=True
-        )
-        cols = st.columns(4)
-        cat_meals = [m for m in meals if m["category"] == cat]
-        for i, meal in enumerate(cat_meals):
-            with cols[i % 4]:
-                st.markdown(f"<div class='meal-card' style='background:{color}'>", unsafe_allow_html=True)
-                st.markdown(
-                    f"**{meal['name']} ({CATEGORY_LABELS.get(meal['category'], {'DE': meal['category'], 'EN': meal['category']})[lang]})**",
-                    unsafe_allow_html=True
-                )
-                if st.button(UI["details"][lang], key=f"detail_manage_{meal['id']}"):
-                    show_meal_detail(meal['id'])
-                if st.button(UI["delete"][lang], key=f"del_manage_{meal['id']}"):
-                    delete_and_refresh(meal['id'])
-                st.markdown("</div>", unsafe_allow_html=True)
-
-
+with metrics.section(sections[st.session_state.view]):
+    views[st.session_state.view].render(lang)
 
 # Detailansicht
-if st.session_state.detail:
-    meal, ings = get_meal(st.session_state.detail)
-    if meal:
-        st.markdown("---")
-        # Farbe dynamisch basierend auf DB-Wert
-        color = CATEGORY_COLORS.get(meal["category"], "#333")
-        st.markdown(f"<div class='meal-card' style='background:{color}'>", unsafe_allow_html=True)
-
-        # Name + Kategorie + Stift zum Bearbeiten
-        col_name, col_edit = st.columns([4,1])
-        col_name.markdown(
-            f"### {meal['name']} ({CATEGORY_LABELS.get(meal['category'], {'DE': meal['category'], 'EN': meal['category']})[lang]})",
-            unsafe_allow_html=True
-        )
-        if col_edit.button("✏️", key=f"edit_btn_{meal['id']}"):
-            st.session_state[f"edit_meal_{meal['id']}"] = True
-
-        st.markdown("</div>", unsafe_allow_html=True)
-
-        # Bearbeitungsformular nur anzeigen, wenn Flag gesetzt
-        if st.session_state.get(f"edit_meal_{meal['id']}", False):
-            with st.form(f"edit_meal_form_{meal['id']}"):
-                new_name = st.text_input(
-                    ("Gericht" if lang=="DE" else "Meal name"),
-                    value=meal["name"]
-                )
-                new_category = st.selectbox(
-                    ("Kategorie" if lang=="DE" else "Category"),
-                    options=CATEGORIES,
-                    index=CATEGORIES.index(meal["category"]),
-                    format_func=lambda c: CATEGORY_LABELS.get(c, {"DE": c, "EN": c})[lang]
-                )
-                submitted = st.form_submit_button("💾 " + ("Speichern" if lang=="DE" else "Save"))
-                if submitted:
-                    # Update in DB
-                    with get_db() as conn:
-                        conn.execute(
-                            "UPDATE meal SET name=?, category=? WHERE id=?",
-                            (new_name, new_category, meal['id'])
-                        )
-                        conn.commit()
-
-                    # Formular schließen
-                    st.session_state[f"edit_meal_{meal['id']}"] = False
+with metrics.section("detail_panel"):
+    detail.render(lang)
 
-                    # Wochenplan ggf. aktualisieren, damit Farbe sofort passt
-                    for tag, m_id in st.session_state.plan.items():
-                        if m_id == meal['id']:
-                            st.session_state.plan[tag] = m_id
-
-                    st.rerun()
-
-        # Zutaten
-        st.markdown(f"#### {'Zutaten' if lang=='DE' else 'Ingredients'}")
-        for ing in ings:
-            col1, col2 = st.columns([4,1])
-            col1.write(ing["name"])
-            if col2.button(UI["delete"][lang], key=f"del_ing_{ing['id']}"):
-                delete_ingredient(ing['id'])
-                st.rerun()
-
-        new_ing = st.text_input(
-            "➕ " + ("Neue Zutat" if lang=="DE" else "New ingredient"),
-            key=f"new_ing_{meal['id']}"
-        )
-        if st.button(
-            "✔️ " + ("Hinzufügen" if lang=="DE" else "Add"),
-            key=f"add_ing_{meal['id']}"
-        ):
-            if new_ing.strip():
-                add_ingredient(meal['id'], new_ing.strip())
-                st.rerun()
-
-        # Rezept
-        st.markdown(f"#### {'Rezept' if lang=='DE' else 'Recipe'}")
-        recipe = st.text_area(
-            ("Rezept bearbeiten" if lang=="DE" else "Edit recipe"),
-            meal["recipe"] or "",
-            key=f"recipe_{meal['id']}"
-        )
-        if st.button(
-            "💾 " + ("Speichern" if lang=="DE" else "Save"),
-            key=f"save_recipe_{meal['id']}"
-        ):
-            update_recipe(meal['id'], recipe)
-            st.success("✔️ " + ("Rezept gespeichert!" if lang=="DE" else "Recipe saved!"))
-
-        # Löschen / Zurück
-        c1, c2 = st.columns(2)
-        with c1:
-            if st.button(UI["delete"][lang], key=f"del_meal_{meal['id']}"):
-                delete_meal(meal['id'])
-                st.session_state.detail = None
-                st.rerun()
-        with c2:
-            if st.button(UI["back"][lang], key=f"back_{meal['id']}"):
-                st.session_state.detail = None
-                st.rerun()
-
-    else:
-        st.error(UI["no_exist"][lang])
-        if st.button(UI["back"][lang]):
-            st.session_state.detail = None
-            st.rerun()
+# Debug-Panel: Messwerte dieses Reruns
+if st.sidebar.toggle(UI["debug"][lang], key="debug_metrics"):
+    debug.render(lang, rerun_metrics)
+metrics.end_rerun()
@@ -0,0 +1,33 @@
+"""Hintergrunddienste, die nicht auf die erste Streamlit-Sitzung warten dürfen.
+
+``start.py`` ruft ``start()`` beim Containerstart auf, bevor Streamlit das
+erste Skript ausführt; ``run.py`` ruft es in ``setup()`` noch einmal auf
+(Rückfall bei ``streamlit run run.py``). Jeder Dienst startet höchstens
+einmal pro Prozess.
+"""
+import threading
+
+import api
+import db
+import maintenance
+
+_lock = threading.Lock()
+_problems = None  # Ergebnis der Integritätsprüfung, None = noch nicht gestartet
+
+
+def start():
+    """Schema migrieren, JSON-API starten, Datenbank prüfen, Wartung starten.
+
+    Idempotent; gibt die Fehler der Integritätsprüfung beim Start zurück
+    (leer = in Ordnung).
+    """
+    global _problems
+    with _lock:
+        if _problems is None:
+            db.init_db()
+            if api.API_PORT:  # MEALS_API_PORT=0 schaltet die API ab
+                api.start_in_background()
+            # Sicherungen und Aufräumen auch, wenn niemand die Oberfläche öffnet
+            _problems = maintenance.startup_check()
+            maintenance.start_in_background()
+        return _problems
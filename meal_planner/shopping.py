@@ -0,0 +1,30 @@
+import csv
+import io
+
+
+def iter_text(rows):
+    """Einkaufsliste als Textzeilen, eine Zutat pro Zeile (mit Menge, falls bekannt)."""
+    for row in rows:
+        if row.get("amount"):
+            prefix = f"{row['amount']} "
+        else:
+            prefix = f"{row['count']}× " if row["count"] > 1 else ""
+        yield f"- {prefix}{row['name']}\n"
+
+
+def iter_csv(rows):
+    """Einkaufsliste als CSV, Zeile für Zeile erzeugt."""
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+
+    def drain():
+        chunk = buf.getvalue()
+        buf.seek(0)
+        buf.truncate()
+        return chunk
+
+    writer.writerow(["ingredient", "amount", "count", "meals"])
+    yield drain()
+    for row in rows:
+        writer.writerow([row["name"], row.get("amount", ""), row["count"], row["meals"]])
+        yield drain()
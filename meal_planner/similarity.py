@@ -0,0 +1,205 @@
+"""Ähnliche und andere Gerichte über MinHash-Signaturen der Zutatenmengen.
+
+Pro Gericht eine Signatur aus ``NUM_PERM`` Minima (uint32) über seine
+food_ids; der Anteil gleicher Stellen schätzt die Jaccard-Ähnlichkeit. Die
+Signaturen liegen in ``meal_signature`` und im Speicher als eine Matrix
+(Zeile pro Gericht). LSH: die Signatur wird in ``BANDS`` Bänder geteilt,
+Gerichte mit einem gleichen Band landen im selben Eimer und sind Kandidaten.
+
+- ähnlich: nur die Kandidaten aus den Eimern werden bewertet
+- anders: eine Zufallsstichprobe ohne Eimer-Treffer wird bewertet
+
+Jede Zutatenänderung löscht per Trigger die gespeicherte Signatur; fehlende
+werden beim Aufbau neu berechnet. Bei geladenem Index führt
+``db.add_listener`` die Änderung gleich nach (neu berechnen, speichern,
+Eimer umhängen).
+"""
+import random
+import threading
+from array import array
+from itertools import groupby
+
+import numpy as np
+
+import db
+
+NUM_PERM = 64
+BANDS = 32  # 32 Bänder à 2 Zeilen: Kandidat ab etwa 20 % Ähnlichkeit
+ROWS = NUM_PERM // BANDS
+# Stichprobengröße für "anders"
+DIFFERENT_SAMPLE = 256
+
+_PRIME = (1 << 31) - 1
+# Feste Hash-Parameter: gespeicherte Signaturen bleiben über Neustarts gültig
+_params = random.Random(20)
+_A = np.array([_params.randrange(1, _PRIME) for _ in range(NUM_PERM)], dtype=np.uint64)
+_B = np.array([_params.randrange(0, _PRIME) for _ in range(NUM_PERM)], dtype=np.uint64)
+
+
+def signature(food_ids):
+    x = np.fromiter(food_ids, dtype=np.uint64)
+    return ((np.outer(_A, x) + _B[:, None]) % _PRIME).min(axis=1).astype(np.uint32)
+
+
+class SignatureIndex:
+    __slots__ = ("ids", "rows", "free", "matrix", "buckets", "generation")
+
+    def __init__(self, generation=None):
+        self.ids = array("q")       # Zeile -> meal_id (0 = frei)
+        self.rows = {}              # meal_id -> Zeile
+        self.free = []
+        self.matrix = np.zeros((64, NUM_PERM), dtype=np.uint32)
+        self.buckets = [{} for _ in range(BANDS)]  # Band -> {Bandwert: {meal_id}}
+        self.generation = generation
+
+    def __len__(self):
+        return len(self.rows)
+
+    @staticmethod
+    def _bands(sig):
+        return [sig[b * ROWS:(b + 1) * ROWS].tobytes() for b in range(BANDS)]
+
+    def put(self, meal_id, sig):
+        self.discard(meal_id)
+        if self.free:
+            row = self.free.pop()
+            self.ids[row] = meal_id
+        else:
+            row = len(self.ids)
+            if row == len(self.matrix):
+                self.matrix = np.concatenate([self.matrix, np.zeros_like(self.matrix)])
+            self.ids.append(meal_id)
+        self.matrix[row] = sig
+        self.rows[meal_id] = row
+        for bucket, key in zip(self.buckets, self._bands(sig)):
+            bucket.setdefault(key, set()).add(meal_id)
+
+    def discard(self, meal_id):
+        row = self.rows.pop(meal_id, None)
+        if row is None:
+            return
+        for bucket, key in zip(self.buckets, self._bands(self.matrix[row])):
+            members = bucket[key]
+            members.discard(meal_id)
+            if not members:
+                del bucket[key]
+        self.ids[row] = 0
+        self.free.append(row)
+
+    def _candidates(self, sig):
+        found = set()
+        for bucket, key in zip(self.buckets, self._bands(sig)):
+            found |= bucket.get(key, set())
+        return found
+
+    def _score(self, meal_ids, sig):
+        rows = np.fromiter((self.rows[i] for i in meal_ids), dtype=np.intp, count=len(meal_ids))
+        return (self.matrix[rows] == sig).mean(axis=1)
+
+    def similar(self, meal_id, k=10):
+        """``[(meal_id, geschätzte Ähnlichkeit)]``, ähnlichste zuerst."""
+        row = self.rows.get(meal_id)
+        if row is None:
+            return []
+        sig = self.matrix[row]
+        candidates = list(self._candidates(sig) - {meal_id})
+        if not candidates:
+            return []
+        scores = self._score(candidates, sig)
+        order = np.argsort(-scores, kind="stable")[:k]
+        return [(candidates[i], float(scores[i])) for i in order]
+
+    def different(self, meal_id, k=10, rng=random):
+        """``[(meal_id, geschätzte Ähnlichkeit)]`` aus einer Stichprobe, unähnlichste zuerst."""
+        row = self.rows.get(meal_id)
+        if row is None:
+            return []
+        sig = self.matrix[row]
+        close = self._candidates(sig)
+        live = len(self.ids)
+        sample = rng.sample(range(live), min(live, DIFFERENT_SAMPLE))
+        candidates = [self.ids[r] for r in sample if self.ids[r] and self.ids[r] not in close]
+        if not candidates:
+            return []
+        scores = self._score(candidates, sig)
+        order = np.argsort(scores, kind="stable")[:k]
+        return [(candidates[i], float(scores[i])) for i in order]
+
+
+_lock = threading.Lock()
+_index = None
+
+
+def _store(conn, signatures):
+    conn.executemany(
+        "INSERT OR REPLACE INTO meal_signature (meal_id, signature) VALUES (?, ?)",
+        [(meal_id, sig.tobytes()) for meal_id, sig in signatures]
+    )
+
+
+def current_index():
+    """Index zum aktuellen Datenstand; fehlende Signaturen werden einmal berechnet und gespeichert."""
+    global _index
+    generation = db.data_generation()
+    cached = _index
+    if cached is not None and cached.generation == generation:
+        return cached
+    index = SignatureIndex(generation)
+    with db.get_db() as conn:
+        for meal_id, blob in conn.execute("SELECT meal_id, signature FROM meal_signature"):
+            if len(blob) == NUM_PERM * 4:
+                index.put(meal_id, np.frombuffer(blob, dtype=np.uint32))
+        # Gerichte ohne (gültige) Signatur: neu oder Zutaten geändert (Trigger)
+        rows = conn.execute("""
+        SELECT meal_id, food_id FROM ingredient
+        WHERE meal_id NOT IN (SELECT meal_id FROM meal_signature WHERE length(signature) = ?)
+        ORDER BY meal_id
+        """, (NUM_PERM * 4,)).fetchall()
+        computed = [
+            (meal_id, signature(r[1] for r in group))
+            for meal_id, group in groupby(rows, key=lambda r: r[0])
+        ]
+        if computed:
+            _store(conn, computed)
+    if computed:
+        db.mark_own_write()
+    for meal_id, sig in computed:
+        index.put(meal_id, sig)
+    with _lock:
+        _index = index
+    return index
+
+
+def _on_change(generation, meal_id, added, removed, deleted):
+    with _lock:
+        index = _index
+        if index is None or index.generation != (generation[0] - 1, generation[1]):
+            return
+        if deleted:
+            index.discard(meal_id)  # Zeile in meal_signature fällt per ON DELETE CASCADE
+        elif added or removed:
+            # Ein Minimum lässt sich nicht "abziehen": Signatur aus allen Zutaten neu
+            with db.get_db() as conn:
+                food_ids = [r[0] for r in conn.execute(
+                    "SELECT DISTINCT food_id FROM ingredient WHERE meal_id=?", (meal_id,)
+                )]
+                if food_ids:
+                    sig = signature(food_ids)
+                    _store(conn, [(meal_id, sig)])
+                    index.put(meal_id, sig)
+                else:
+                    conn.execute("DELETE FROM meal_signature WHERE meal_id=?", (meal_id,))
+                    index.discard(meal_id)
+            db.mark_own_write()
+        index.generation = generation
+
+
+db.add_listener(_on_change)
+
+
+def similar_meals(meal_id, k=10):
+    return [i for i, _ in current_index().similar(meal_id, k)]
+
+
+def different_meals(meal_id, k=10, rng=random):
+    return [i for i, _ in current_index().different(meal_id, k, rng)]
@@ -0,0 +1,23 @@
+"""Einstieg des Add-ons: Hintergrunddienste sofort starten, dann Streamlit.
+
+Streamlit führt ``run.py`` erst aus, wenn ein Browser verbindet; JSON-API,
+Integritätsprüfung und Wartung sollen aber ab dem Containerstart laufen. Streamlit läuft im selben Prozess,
+``run.py`` findet die Dienste dann bereits gestartet vor::
+
+    python start.py --server.port=5000 --server.address=0.0.0.0
+"""
+import logging
+import os
+import sys
+
+from streamlit.web import cli
+
+import services
+
+APP = os.path.join(os.path.dirname(os.path.abspath(__file__)), "run.py")
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    services.start()
+    sys.argv = ["streamlit", "run", APP, *sys.argv[1:]]
+    sys.exit(cli.main())
@@ -0,0 +1,8 @@
+import os
+import sys
+import tempfile
+
+# Module liegen flach in meal_planner/ (wie beim Start über streamlit run)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Datenbank der Tests nie im echten Datenverzeichnis (vor dem Import von db)
+os.environ["MEALS_DATA_DIR"] = tempfile.mkdtemp(prefix="meal-tests-")
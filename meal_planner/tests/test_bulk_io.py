@@ -0,0 +1,98 @@
+import io
+import json
+
+import pytest
+
+import bulk_io
+
+
+def jsonl(*lines):
+    return list(bulk_io.iter_jsonl(io.StringIO("\n".join(lines) + "\n")))
+
+
+def test_jsonl_record():
+    [record] = jsonl('{"name": " Linsensuppe ", "category": "Vegan", "ingredients": ["200 g Linsen", " "],'
+                     ' "servings": "2"}')
+    assert record == {
+        "name": "Linsensuppe", "category": "Vegan", "recipe": "",
+        "ingredients": ["200 g Linsen"], "servings": 2,
+    }
+
+
+def test_jsonl_unknown_category_uses_default():
+    [record] = jsonl('{"name": "Suppe", "category": "Unbekannt"}')
+    assert record["category"] == bulk_io.DEFAULT_CATEGORY
+
+
+def test_jsonl_ingredients_as_text_are_split():
+    [record] = jsonl('{"name": "Salat", "ingredients": "Salz, Pfeffer, 1,5 kg Kartoffeln"}')
+    assert record["ingredients"] == ["Salz", "Pfeffer", "1,5 kg Kartoffeln"]
+
+
+@pytest.mark.parametrize("line", ['["Salat"]', '"Salat"', "3", "null"])
+def test_jsonl_line_must_be_object(line):
+    with pytest.raises(ValueError, match="Zeile 2: JSON-Objekt erwartet"):
+        jsonl('{"name": "Suppe"}', line)
+
+
+@pytest.mark.parametrize("line", [
+    '{"name": "Salat", "ingredients": 3}',
+    '{"name": "Salat", "ingredients": {"Salz": 1}}',
+    '{"name": "Salat", "ingredients": ["Salz", 3]}',
+    '{"name": ["Salat"]}',
+    '{"name": "Salat", "recipe": 42}',
+])
+def test_jsonl_wrong_types(line):
+    with pytest.raises(ValueError, match="Zeile 3: "):
+        jsonl('{"name": "Suppe"}', "", line)
+
+
+def test_jsonl_invalid_json_reports_line():
+    with pytest.raises(ValueError, match="Zeile 1: "):
+        jsonl('{"name": ')
+
+
+# Jede Stelle des Dokuments einmal an einer Puffergrenze
+CHUNK_SIZES = [1, 2, 3, 5, 8, bulk_io.CHUNK_SIZE]
+
+DOCUMENTS = [
+    "{}",
+    " \n{ \t}\n",
+    '{"Suppe": {"rezept": "Kochen"}}',
+    '{"a": 1, "b": -12.5e3, "c": true, "d": false, "e": null, "f": [1, [2, {"g": "h"}]]}',
+    '{"Zitat \\"x\\"": {"rezept": "Zeile 1\\nZeile 2\\t\\\\ Ende"}}',
+    '{"K\\u00e4se": {"rezept": "\\ud83c\\udf5d mit K\\u00e4se"}, "Käse 2": "ä"}',
+    '{\n  "lang": "' + "x" * 300 + '",\n  "zahl": 1234567890\n}\n',
+]
+
+
+def parse(text, chunk_size):
+    return list(bulk_io._iter_json_object(io.StringIO(text), chunk_size))
+
+
+@pytest.mark.parametrize("chunk_size", CHUNK_SIZES)
+@pytest.mark.parametrize("text", DOCUMENTS)
+def test_json_object_matches_json_load(text, chunk_size):
+    assert parse(text, chunk_size) == list(json.loads(text).items())
+
+
+@pytest.mark.parametrize("chunk_size", CHUNK_SIZES)
+@pytest.mark.parametrize("text", [
+    "",
+    "[1, 2]",
+    '{"a" 1}',
+    '{"a": 1 "b": 2}',
+    '{"a": 1,}',
+    '{"a": 1',
+    '{"a": "offen}',
+    '{"a": tru}',
+    '{1: 2}',
+])
+def test_json_object_malformed(text, chunk_size):
+    with pytest.raises(ValueError):
+        parse(text, chunk_size)
+
+
+def test_legacy_json_reads_recipes():
+    records = list(bulk_io.iter_legacy_json(io.StringIO('{"Suppe": {"rezept": "Kochen"}, "Brot": "alt"}')))
+    assert [(r["name"], r["recipe"]) for r in records] == [("Suppe", "Kochen"), ("Brot", "")]
@@ -0,0 +1,28 @@
+import pytest
+
+import db
+import pantry
+
+
+@pytest.fixture(autouse=True, scope="module")
+def database():
+    db.init_db()
+
+
+def test_index_follows_meal_deletion():
+    db.add_meal("Vorrat Omelett", "Vegetarisch", "", ["3 Eier", "Salz", "50 g Käse"])
+    db.add_meal("Vorrat Rührei", "Vegetarisch", "", ["4 Eier", "Salz"])
+    index = pantry.current_index()
+    eggs = pantry.food_ids("Eier")
+    omelett = next(m["id"] for m in db.get_meals() if m["name"] == "Vorrat Omelett")
+    assert omelett in {meal_id for meal_id, _, _ in index.rank(eggs)}
+
+    db.delete_meal(omelett)
+    # Nachgeführt statt neu gebaut, und gleich dem frisch gebauten Index
+    assert pantry.current_index() is index
+    assert omelett not in index.sizes
+    assert all(omelett not in ids for ids in index.postings.values())
+    pantry._index = None
+    rebuilt = pantry.current_index()
+    assert {k: list(v) for k, v in index.postings.items()} == {k: list(v) for k, v in rebuilt.postings.items()}
+    assert +index.sizes == +rebuilt.sizes
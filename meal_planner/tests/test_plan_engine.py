@@ -0,0 +1,118 @@
+import random
+from collections import Counter
+
+import pytest
+
+from plan_engine import Catalog, Constraints, PlanError, generate, reroll
+
+DAYS = [str(d) for d in range(1, 8)]
+
+
+def catalog(**sizes):
+    """``catalog(Vegan=3, Fleisch=2)``: fortlaufende IDs pro Kategorie."""
+    pairs, next_id = [], 1
+    for category, n in sizes.items():
+        pairs += [(i, category) for i in range(next_id, next_id + n)]
+        next_id += n
+    return Catalog(pairs)
+
+
+def categories(cat, plan):
+    return Counter(cat.category_of[m] for m in plan.values())
+
+
+def test_plan_covers_all_days_without_repeats():
+    cat = catalog(Vegan=10, Fleisch=10, Fisch=10)
+    plan = generate(cat, DAYS, rng=random.Random(1))
+    assert list(plan) == DAYS
+    assert len(set(plan.values())) == len(DAYS)
+
+
+def test_repeats_allowed_when_switched_off():
+    cat = catalog(Vegan=2)
+    plan = generate(cat, DAYS, Constraints(no_repeats=False), random.Random(1))
+    assert set(plan.values()) <= {1, 2}
+    with pytest.raises(PlanError):
+        generate(cat, DAYS)
+
+
+def test_empty_catalog():
+    with pytest.raises(PlanError):
+        generate(Catalog([]), DAYS)
+
+
+def test_pinned_days_stay_and_are_not_repeated():
+    cat = catalog(Vegan=4, Fleisch=4)
+    plan = generate(cat, DAYS, Constraints(pinned={"2": 1, "5": 5}), random.Random(1))
+    assert plan["2"] == 1 and plan["5"] == 5
+    assert len(set(plan.values())) == len(DAYS)
+
+
+def test_pinned_meals_count_towards_limit():
+    cat = catalog(Vegan=10, Fleisch=10)
+    c = Constraints(max_per_category={"Vegan": 2}, pinned={"1": 1, "2": 2})
+    assert categories(cat, generate(cat, DAYS, c, random.Random(1)))["Vegan"] == 2
+
+
+def test_category_limits():
+    # Vier vegane Gerichte: die Limits erzwingen genau diese Aufteilung
+    cat = catalog(Vegan=4, Fleisch=10, Fisch=10)
+    c = Constraints(max_per_category={"Fleisch": 1, "Fisch": 2})
+    counts = categories(cat, generate(cat, DAYS, c, random.Random(1)))
+    assert counts == {"Vegan": 4, "Fleisch": 1, "Fisch": 2}
+
+
+def test_limits_too_tight():
+    cat = catalog(Vegan=10, Fleisch=10)
+    with pytest.raises(PlanError):
+        generate(cat, DAYS, Constraints(max_per_category={"Vegan": 3, "Fleisch": 3}))
+
+
+def test_recent_meals_are_skipped():
+    cat = catalog(Vegan=10)
+    plan = generate(cat, DAYS, Constraints(recent=frozenset({1, 2, 3})), random.Random(1))
+    assert set(plan.values()) == set(range(4, 11))
+    with pytest.raises(PlanError):
+        generate(cat, DAYS, Constraints(recent=frozenset({1, 2, 3, 4})))
+
+
+def test_zero_weight_excludes_category():
+    cat = catalog(Vegan=10, Fleisch=10)
+    c = Constraints(day_weights={d: {"Fleisch": 0} for d in ("6", "7")})
+    plan = generate(cat, DAYS, c, random.Random(1))
+    assert cat.category_of[plan["6"]] == cat.category_of[plan["7"]] == "Vegan"
+
+
+def test_limit_reserved_for_day_that_needs_it():
+    # Vegan nur einmal erlaubt und Tag 7 ohne Fleisch: Vegan muss für Tag 7
+    # bleiben. Ohne Vorausschau ging das für fast jeden Seed schief.
+    cat = catalog(Vegan=19, Fleisch=20)
+    c = Constraints(max_per_category={"Vegan": 1}, day_weights={"7": {"Fleisch": 0}})
+    for seed in range(10):
+        plan = generate(cat, DAYS, c, random.Random(seed))
+        assert cat.category_of[plan["7"]] == "Vegan"
+        assert categories(cat, plan)["Vegan"] == 1
+
+
+def test_weights_and_limits_unsatisfiable():
+    cat = catalog(Vegan=19, Fleisch=20)
+    c = Constraints(max_per_category={"Vegan": 1}, day_weights={d: {"Fleisch": 0} for d in ("6", "7")})
+    with pytest.raises(PlanError, match="Für 7"):
+        generate(cat, DAYS, c)
+
+
+def test_weights_shift_distribution():
+    cat = catalog(Vegan=50, Fleisch=50)
+    c = Constraints(day_weights={"1": {"Vegan": 9}}, no_repeats=False)
+    rng = random.Random(1)
+    vegan = sum(cat.category_of[generate(cat, ["1"], c, rng)["1"]] == "Vegan" for _ in range(1000))
+    assert vegan > 800
+
+
+def test_reroll_changes_only_one_day():
+    cat = catalog(Vegan=10, Fleisch=10)
+    rng = random.Random(1)
+    plan = generate(cat, DAYS, rng=rng)
+    new_meal = reroll(cat, plan, "3", rng=rng)
+    assert new_meal != plan["3"]
+    assert new_meal not in {m for d, m in plan.items() if d != "3"}
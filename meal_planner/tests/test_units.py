@@ -0,0 +1,71 @@
+import pytest
+
+from units import format_ingredient, parse_ingredient, split_ingredients, to_base
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("500 g Spaghetti", ("Spaghetti", 500.0, "g")),
+    ("500g Spaghetti", ("Spaghetti", 500.0, "g")),
+    ("1 Kilo Mehl", ("Mehl", 1.0, "kg")),
+    ("2 EL. Olivenöl", ("Olivenöl", 2.0, "EL")),
+    ("1 Essl Zucker", ("Zucker", 1.0, "EL")),
+    ("3 Teelöffel Zimt", ("Zimt", 3.0, "TL")),
+    ("1 Pck. Backpulver", ("Backpulver", 1.0, "Pck")),
+    ("2 Zehen Knoblauch", ("Knoblauch", 2.0, "Zehe")),
+    ("  2   Eier ", ("Eier", 2.0, "Stk")),
+    ("2 Zwiebeln", ("Zwiebeln", 2.0, "Stk")),
+])
+def test_units(text, expected):
+    assert parse_ingredient(text) == expected
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("1,5 kg Kartoffeln", ("Kartoffeln", 1.5, "kg")),
+    ("0.5 l Milch", ("Milch", 0.5, "l")),
+    ("1/2 TL Salz", ("Salz", 0.5, "TL")),
+    ("3/4 Tasse Reis", ("Reis", 0.75, "Tasse")),
+    ("½ Zwiebel", ("Zwiebel", 0.5, "Stk")),
+    ("¼ l Sahne", ("Sahne", 0.25, "l")),
+])
+def test_fractions_and_decimals(text, expected):
+    assert parse_ingredient(text) == expected
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("2-3 Zwiebeln", ("Zwiebeln", 3.0, "Stk")),
+    ("200–250 g Mehl", ("Mehl", 250.0, "g")),
+    ("1/2-1 TL Salz", ("Salz", 1.0, "TL")),
+    ("1,5-2kg Kartoffeln", ("Kartoffeln", 2.0, "kg")),
+])
+def test_ranges_use_upper_bound(text, expected):
+    assert parse_ingredient(text) == expected
+
+
+@pytest.mark.parametrize("text", [
+    "Salz",
+    "Salz und Pfeffer",
+    "3",          # nur eine Zahl
+    "500 g",      # Menge ohne Zutat
+    "3x Eier",    # unbekannte Einheit direkt an der Zahl
+    "1/0 TL Salz",
+    "2-Zimmer-Brot",
+])
+def test_without_quantity_the_text_is_the_name(text):
+    assert parse_ingredient(text) == (" ".join(text.split()), None, None)
+
+
+def test_empty():
+    assert parse_ingredient("   ") == ("", None, None)
+
+
+def test_to_base_and_format():
+    assert to_base(1.5, "kg") == (1500.0, "g")
+    assert to_base(2, "EL") == (30, "ml")
+    assert to_base(1, "Bund") == (1, "Bund")
+    assert format_ingredient(*parse_ingredient("1500 g Mehl")) == "1,5 kg Mehl"
+    assert format_ingredient(*parse_ingredient("2 Eier")) == "2 Eier"
+    assert format_ingredient("Salz", None, None) == "Salz"
+
+
+def test_split_keeps_decimal_commas():
+    assert split_ingredients("1,5 kg Mehl, 2 Eier,,Salz ") == ["1,5 kg Mehl", "2 Eier", "Salz"]
@@ -0,0 +1,44 @@
+import pytest
+
+import api
+import db
+import user_state
+
+
+@pytest.fixture(autouse=True, scope="module")
+def database():
+    db.init_db()
+
+
+def test_unknown_profiles_are_not_remembered():
+    before = len(user_state._versions)
+    for i in range(100):
+        assert user_state.state_version(f"fremd-{i}") == 0
+        assert api.respond("GET", f"/api/week?profile=fremd-api-{i}", {})[0] == 200
+    assert len(user_state._versions) == before
+
+
+def test_version_cache_is_bounded():
+    for i in range(user_state.VERSION_CACHE_SIZE + 10):
+        user_state.load_user_state(f"haushalt-{i}")
+    assert len(user_state._versions) == user_state.VERSION_CACHE_SIZE
+    # Verdrängte Profile werden wieder aus der Datenbank gelesen
+    assert user_state.state_version("haushalt-0") == 0
+    assert "haushalt-0" in user_state._versions
+
+
+def test_save_with_stale_version_conflicts():
+    meal_id = db.get_meals()[0]["id"]
+    _, _, version = user_state.load_user_state("konflikt")
+    # Zwei Geräte kennen dieselbe Version; das erste gewinnt
+    assert user_state.save_user_state("konflikt", {"Montag": meal_id}, "DE", version) == version + 1
+    assert user_state.save_user_state("konflikt", {"Dienstag": meal_id}, "EN", version) is None
+    plan, lang, current = user_state.load_user_state("konflikt")
+    assert (plan, lang, current) == ({"Montag": meal_id}, "DE", version + 1)
+    assert user_state.state_version("konflikt") == version + 1
+    # Mit der neuen Version darf das zweite Gerät schreiben
+    assert user_state.save_user_state("konflikt", {"Dienstag": meal_id}, "EN", current) == version + 2
+
+
+def test_save_for_unknown_profile_conflicts():
+    assert user_state.save_user_state("nie-geladen", {}, "DE", 0) is None
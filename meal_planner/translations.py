@@ -35,3 +35,127 @@ EN = {
     "submit": "Submit",
     "save": "Saved!"
 }
+
+# Labels pro Sprache
+CATEGORY_LABELS = {
+"Vegan": {"DE": "Vegan", "EN": "Vegan"},
+"Vegetarisch": {"DE": "Vegetarisch", "EN": "Vegetarian"},
+"Fleisch": {"DE": "Fleisch", "EN": "Meat"},
+}
+# Wochentage
+DAYS = {
+"DE": ["Montag", "Dienstag", "Mittwoch", "Donnerstag", "Freitag", "Samstag", "Sonntag"],
+"EN": ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+}
+
+# UI-Labels & Übersetzungen
+UI = {
+    "lang_radio":    {"DE": "Sprache",                           "EN": "Language"},
+    "plan_title":    {"DE": "🗓️ Wochen-Mahlzeiten-Planer",       "EN": "🗓️ Weekly Meal Planner"},
+    "plan_header":   {"DE": "## Dein Wochenplan",               "EN": "## Your Weekly Plan"},
+    "reroll":        {"DE": "🔄 Neu würfeln",                   "EN": "🔄 Reroll"},
+    "reroll_help":   {"DE": "Neu würfeln",                      "EN": "Reroll this day"},
+    "reroll_similar": {"DE": "≈",                               "EN": "≈"},
+    "reroll_similar_help": {"DE": "Ähnliches Gericht (ähnliche Zutaten)", "EN": "Something similar (shared ingredients)"},
+    "reroll_different": {"DE": "≠",                             "EN": "≠"},
+    "reroll_different_help": {"DE": "Etwas ganz anderes (andere Zutaten)", "EN": "Something different (other ingredients)"},
+    "details":       {"DE": "ℹ️ Details",                       "EN": "ℹ️ Details"},
+    "delete":        {"DE": "🗑️ Löschen",                       "EN": "🗑️ Delete"},
+    "reroll_week":   {"DE": "Woche komplett neu würfeln",       "EN": "Reroll entire week"},
+    "manage_title":  {"DE": "🍽️ Mahlzeiten verwalten",         "EN": "🍽️ Manage Meals"},
+    "manage_desc":   {"DE": "Lege neue Gerichte an, bearbeite oder lösche bestehende.",
+                      "EN": "Add, edit or delete meals."},
+    "new_meal":      {"DE": "➕ Neue Mahlzeit hinzufügen",      "EN": "➕ Add New Meal"},
+    "form_name":     {"DE": "Gericht",                         "EN": "Meal name"},
+    "form_category": {"DE": "Kategorie",                       "EN": "Category"},
+    "form_recipe":   {"DE": "Rezept",                          "EN": "Recipe"},
+    "form_ings":     {"DE": "Zutaten (Kommagetrennt)",         "EN": "Ingredients (comma separated)"},
+    "add_button":    {"DE": "✔️ Anlegen",                      "EN": "✔️ Create"},
+    "success_add":   {"DE": "Mahlzeit gespeichert!",           "EN": "Meal saved!"},
+    "tip":           {"DE": "**Tipp:** Neue Gerichte kannst du im Menü 'Mahlzeiten verwalten' anlegen.",
+                      "EN": "**Tip:** You can add new meals under 'Manage Meals'."},
+    "back":          {"DE": "⬅️ Zurück",                        "EN": "⬅️ Back"},
+    "no_exist":      {"DE": "Dieses Gericht existiert nicht mehr.","EN": "This meal no longer exists."},
+    "exists":        {"DE": "Diese Mahlzeit gibt es schon!",     "EN": "This meal already exists!"},
+    "pin":           {"DE": "📌 Fixieren",                       "EN": "📌 Pin"},
+    "pin_help":      {"DE": "Bleibt beim Neu-Würfeln der Woche erhalten", "EN": "Kept when rerolling the week"},
+    "rules":         {"DE": "⚙️ Planungsregeln",                 "EN": "⚙️ Planning rules"},
+    "no_repeats":    {"DE": "Keine Wiederholungen in der Woche (wenn genug Gerichte da sind)",
+                      "EN": "No repeats within the week (if there are enough meals)"},
+    "max_per_week":  {"DE": "Höchstens pro Woche",               "EN": "At most per week"},
+    "shopping_title":{"DE": "🛒 Einkaufsliste",                  "EN": "🛒 Shopping List"},
+    "shopping_desc": {"DE": "Alle Zutaten für deinen Wochenplan.", "EN": "All ingredients for your weekly plan."},
+    "shopping_empty":{"DE": "Für diese Woche sind keine Zutaten eingetragen.",
+                      "EN": "No ingredients recorded for this week."},
+    "export_txt":    {"DE": "⬇️ Als Text",                       "EN": "⬇️ As text"},
+    "export_csv":    {"DE": "⬇️ Als CSV",                        "EN": "⬇️ As CSV"},
+    "search":        {"DE": "🔍 Suchen (Name, Rezept, Zutaten)", "EN": "🔍 Search (name, recipe, ingredients)"},
+    "no_results":    {"DE": "Keine Treffer.",                    "EN": "No results."},
+    "page_size":     {"DE": "Gerichte pro Seite",                "EN": "Meals per page"},
+    "show_cat":      {"DE": "Anzeigen",                          "EN": "Show"},
+    "prev":          {"DE": "◀️ Zurück",                         "EN": "◀️ Previous"},
+    "next":          {"DE": "Weiter ▶️",                         "EN": "Next ▶️"},
+    "page":          {"DE": "Seite",                             "EN": "Page"},
+    "bulk_title":    {"DE": "📦 Import / Export",                "EN": "📦 Import / Export"},
+    "bulk_file":     {"DE": "Datei (meals.json, CSV oder JSON Lines)", "EN": "File (meals.json, CSV or JSON Lines)"},
+    "bulk_category": {"DE": "Kategorie für Einträge ohne Kategorie", "EN": "Category for entries without one"},
+    "bulk_import":   {"DE": "⬆️ Importieren",                    "EN": "⬆️ Import"},
+    "bulk_result":   {"DE": "{} importiert, {} übersprungen (schon vorhanden).",
+                      "EN": "{} imported, {} skipped (already present)."},
+    "bulk_error":    {"DE": "Import fehlgeschlagen: ",           "EN": "Import failed: "},
+    "backup_title":  {"DE": "🛟 Datensicherung",                  "EN": "🛟 Backups"},
+    "backup_now":    {"DE": "Jetzt sichern",                     "EN": "Back up now"},
+    "backup_done":   {"DE": "Gesichert: ",                       "EN": "Saved: "},
+    "backup_none":   {"DE": "Noch keine Sicherung vorhanden.",   "EN": "No backups yet."},
+    "backup_pick":   {"DE": "Sicherung",                         "EN": "Backup"},
+    "backup_confirm": {"DE": "Aktuellen Stand ersetzen (wird vorher gesichert)",
+                       "EN": "Replace current data (a backup is taken first)"},
+    "backup_restore": {"DE": "♻️ Wiederherstellen",              "EN": "♻️ Restore"},
+    "backup_restored": {"DE": "Wiederhergestellt.",              "EN": "Restored."},
+    "backup_error":  {"DE": "Fehlgeschlagen: ",                  "EN": "Failed: "},
+    "integrity_error": {"DE": "Die Datenbank ist beschädigt. Unter Verwaltung → Datensicherung lässt sie sich wiederherstellen.",
+                        "EN": "The database is damaged. It can be restored under Manage → Backups."},
+    "debug":         {"DE": "🐞 Messwerte",                      "EN": "🐞 Metrics"},
+    "debug_summary": {"DE": "{} SQL ({:.1f} ms) · {} Verbindungen ({} neu) · {:.1f} ms gesamt",
+                      "EN": "{} SQL ({:.1f} ms) · {} connections ({} new) · {:.1f} ms total"},
+    "debug_repeated":{"DE": "Wiederholte Abfrage (N+1?)",        "EN": "Repeated query (N+1?)"},
+    "debug_slow":    {"DE": "Langsame Abfrage",                  "EN": "Slow query"},
+    "plan_error":    {"DE": "Plan nicht möglich: ",              "EN": "Cannot build plan: "},
+    "plan_relaxed":  {"DE": "Wiederholungen und zuletzt gekochte Gerichte wurden zugelassen, sonst wäre kein Plan möglich: ",
+                      "EN": "Repeats and recently cooked meals were allowed, otherwise no plan was possible: "},
+    "recent_weeks":  {"DE": "Nichts aus den letzten Wochen wiederholen (Anzahl Wochen, 0 = aus)",
+                      "EN": "Don't repeat meals from the last weeks (number of weeks, 0 = off)"},
+    "history_title": {"DE": "📅 Verlauf & Vorausplanung",        "EN": "📅 History & Planning Ahead"},
+    "history_desc":  {"DE": "Was wann gekocht wurde und was geplant ist.",
+                      "EN": "What was cooked when and what is planned."},
+    "ahead_weeks":   {"DE": "Wochen vorausplanen",               "EN": "Weeks to plan ahead"},
+    "ahead_button":  {"DE": "🗓️ Ab nächster Woche planen",       "EN": "🗓️ Plan from next week"},
+    "ahead_result":  {"DE": "{} Tage neu geplant.",              "EN": "{} days planned."},
+    "history_weeks": {"DE": "Wochen zurück",                     "EN": "Weeks back"},
+    "history_empty": {"DE": "Noch keine Einträge.",              "EN": "No entries yet."},
+    "col_date":      {"DE": "Datum",                             "EN": "Date"},
+    "col_day":       {"DE": "Tag",                               "EN": "Day"},
+    "col_meal":      {"DE": "Gericht",                           "EN": "Meal"},
+    "col_category":  {"DE": "Kategorie",                         "EN": "Category"},
+    "servings":      {"DE": "Portionen",                         "EN": "Servings"},
+    "ings_placeholder":{"DE": "z. B. 500 g Spaghetti, 2 Zwiebeln, Salz",
+                      "EN": "e.g. 500 g spaghetti, 2 onions, salt"},
+    "ing_placeholder":{"DE": "z. B. 2 EL Olivenöl",              "EN": "e.g. 2 EL olive oil"},
+    "household":     {"DE": "Personen im Haushalt",              "EN": "People in household"},
+    "pantry_title":  {"DE": "🧺 Was kann ich kochen?",           "EN": "🧺 What can I cook?"},
+    "pantry_desc":   {"DE": "Trag ein, was da ist – Gerichte mit den wenigsten fehlenden Zutaten stehen oben.",
+                      "EN": "Enter what you have – meals with the fewest missing ingredients come first."},
+    "pantry_input":  {"DE": "Vorrat (kommagetrennt)",            "EN": "Pantry (comma separated)"},
+    "pantry_missing":{"DE": "Höchstens fehlende Zutaten",        "EN": "At most missing ingredients"},
+    "pantry_none":   {"DE": "Keine passenden Gerichte.",         "EN": "No matching meals."},
+    "pantry_all":    {"DE": "alles da",                          "EN": "all there"},
+    "pantry_lacks":  {"DE": "fehlt",                             "EN": "missing"},
+    "use_pantry":    {"DE": "Vorrat bevorzugen",                 "EN": "Prefer pantry"},
+    "use_pantry_help":{"DE": "Gerichte, für die höchstens eine Zutat fehlt (Vorrat unter „Was kann ich kochen?“)",
+                      "EN": "Meals missing at most one ingredient (pantry under “What can I cook?”)"},
+    "state_conflict":{"DE": "Der Plan wurde auf einem anderen Gerät geändert – aktueller Stand geladen.",
+                      "EN": "The plan was changed on another device – loaded the latest version."},
+}
+
+# Sprachkürzel -> allgemeine Texte (DE/EN oben)
+LANGS = {"DE": DE, "EN": EN}
@@ -0,0 +1,116 @@
+"""Mengenangaben in Zutaten: Einlesen ("500 g Spaghetti"), Umrechnen, Ausgeben.
+
+Gespeichert wird die Einheit so, wie sie eingegeben wurde (kanonische
+Schreibweise, z. B. "EL"); zum Summieren rechnet ``to_base`` in eine
+Grundeinheit pro Größe um (g, ml, Stk; Zähleinheiten wie "Bund" bleiben).
+"""
+import re
+
+# Schreibweise (klein, ohne Punkt) -> (kanonische Einheit, Grundeinheit, Faktor)
+UNITS = {}
+for _names, _unit, _base, _factor in [
+    (("g", "gr", "gramm"), "g", "g", 1),
+    (("kg", "kilo", "kilogramm"), "kg", "g", 1000),
+    (("mg",), "mg", "g", 0.001),
+    (("ml", "milliliter"), "ml", "ml", 1),
+    (("cl",), "cl", "ml", 10),
+    (("dl",), "dl", "ml", 100),
+    (("l", "liter"), "l", "ml", 1000),
+    (("el", "essl", "esslöffel"), "EL", "ml", 15),
+    (("tl", "teel", "teelöffel"), "TL", "ml", 5),
+    (("tasse", "tassen"), "Tasse", "ml", 250),
+    (("stk", "stück"), "Stk", "Stk", 1),
+    (("prise", "prisen"), "Prise", "Prise", 1),
+    (("dose", "dosen"), "Dose", "Dose", 1),
+    (("bund",), "Bund", "Bund", 1),
+    (("zehe", "zehen"), "Zehe", "Zehe", 1),
+    (("pck", "päckchen", "packung"), "Pck", "Pck", 1),
+    (("scheibe", "scheiben"), "Scheibe", "Scheibe", 1),
+]:
+    for _name in _names:
+        UNITS[_name] = (_unit, _base, _factor)
+
+# Kanonische Einheit -> (Grundeinheit, Faktor)
+TO_BASE = {unit: (base, factor) for unit, base, factor in UNITS.values()}
+# Ab dieser Menge wird die größere Einheit angezeigt
+_LARGER = {"g": ("kg", 1000), "ml": ("l", 1000)}
+
+_FRACTIONS = {"½": 0.5, "¼": 0.25, "¾": 0.75}
+# Trennt "1,5 kg Mehl, 2 Eier" an Kommas, die nicht vor einer Ziffer stehen
+_SEPARATOR = re.compile(r",(?!\d)")
+_NUMBER = r"\d+(?:[.,]\d+)?|\d+/\d+|[½¼¾]"
+# Menge, optional als Bereich ("2-3", "200–250"; es zählt die Obergrenze), dann ggf. Einheit
+_AMOUNT = re.compile(rf"^(?:(?:{_NUMBER})[-–])?({_NUMBER})([^\d\s/.,].*)?$")
+
+
+def _number(text):
+    if text in _FRACTIONS:
+        return _FRACTIONS[text]
+    if "/" in text:
+        num, den = text.split("/")
+        return int(num) / int(den) if int(den) else None
+    return float(text.replace(",", "."))
+
+
+def parse_ingredient(text):
+    """``"500 g Spaghetti"`` -> ``("Spaghetti", 500.0, "g")``.
+
+    Ohne Mengenangabe sind Menge und Einheit ``None``; eine Zahl ohne
+    bekannte Einheit zählt als Stück (``"2 Zwiebeln"``). Von einem Bereich
+    (``"2-3 EL Öl"``) bleibt die Obergrenze, damit der Einkauf reicht.
+    """
+    tokens = text.split()
+    if not tokens:
+        return "", None, None
+    match = _AMOUNT.match(tokens[0])
+    if not match:
+        return " ".join(tokens), None, None
+    quantity = _number(match.group(1))
+    rest = tokens[1:]
+    unit_text = match.group(2)  # "500g"
+    if unit_text is None and rest:
+        unit_text = rest[0]
+        if unit_text.lower().rstrip(".") in UNITS:
+            rest = rest[1:]
+        else:
+            unit_text = None
+    elif unit_text is not None and unit_text.lower().rstrip(".") not in UNITS:
+        return " ".join(tokens), None, None
+    if not rest or quantity is None:
+        return " ".join(tokens), None, None
+    unit = UNITS[unit_text.lower().rstrip(".")][0] if unit_text else "Stk"
+    return " ".join(rest), quantity, unit
+
+
+def split_ingredients(text):
+    """Kommagetrennte Zutatenliste; Dezimalkommas ("1,5 kg") bleiben erhalten."""
+    return [part.strip() for part in _SEPARATOR.split(text) if part.strip()]
+
+
+def to_base(quantity, unit):
+    """Menge in der Grundeinheit: ``(1.5, "kg")`` -> ``(1500.0, "g")``."""
+    base, factor = TO_BASE.get(unit, (unit, 1))
+    return quantity * factor, base
+
+
+def format_quantity(quantity):
+    return f"{round(quantity, 2):g}".replace(".", ",")
+
+
+def format_amount(quantity, unit):
+    """Menge mit Einheit; große Mengen in g/ml als kg/l."""
+    if quantity is None:
+        return ""
+    larger = _LARGER.get(unit)
+    if larger and quantity >= larger[1]:
+        quantity, unit = quantity / larger[1], larger[0]
+    return f"{format_quantity(quantity)} {unit}"
+
+
+def format_ingredient(name, quantity, unit):
+    """Gegenstück zu ``parse_ingredient`` für Anzeige und Export."""
+    if quantity is None:
+        return name
+    if unit == "Stk":
+        return f"{format_quantity(quantity)} {name}"
+    return f"{format_amount(quantity, unit)} {name}"
@@ -0,0 +1,134 @@
+"""Wochenplan und Sprache pro Haushalt/Profil in der Datenbank.
+
+Alle Sitzungen eines Profils (Handys, Wandtablet) teilen sich eine Zeile in
+``profile_state``. Geschrieben wird optimistisch: ``save_user_state`` gelingt
+nur, wenn die Sitzung die aktuelle Version kennt. Mit ``state_version``
+prüfen Sitzungen günstig, ob ein anderes Gerät etwas geändert hat.
+"""
+import json
+import os
+import threading
+from collections import OrderedDict
+
+import db
+from plan_history import read_week, week_start, write_week
+
+DEFAULT_PROFILE = os.environ.get("MEALS_PROFILE", "default")
+# Abstand in Sekunden, in dem offene Sitzungen nach Änderungen fragen
+POLL_INTERVAL = float(os.environ.get("MEALS_STATE_POLL", "5"))
+# Frühere Speicherorte; werden beim ersten Laden des Standardprofils übernommen
+STATE_FILE = os.path.join(db.DATA_DIR, "user_state.json")
+LEGACY_STATE_FILE = "user_state.json"  # früher relativ zum Arbeitsverzeichnis
+# Höchstzahl gemerkter Profil-Versionen; ?profile= kommt auch über die API von außen
+VERSION_CACHE_SIZE = 64
+
+_lock = threading.Lock()
+# Profil -> (Datengeneration, Version), nur vorhandene Profile (LRU);
+# spart Datenbankzugriffe beim Nachfragen
+_versions = OrderedDict()
+
+
+def _legacy_state():
+    for path in (STATE_FILE, LEGACY_STATE_FILE):
+        if os.path.exists(path):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    return json.load(f)
+            except (OSError, ValueError):
+                return {}
+    return {}
+
+
+def _remember(profile, version):
+    with _lock:
+        _versions[profile] = (db.data_generation(), version)
+        _versions.move_to_end(profile)
+        while len(_versions) > VERSION_CACHE_SIZE:
+            _versions.popitem(last=False)
+
+
+def load_user_state(profile=DEFAULT_PROFILE):
+    """Gibt ``(plan, lang, version)`` zurück und legt das Profil bei Bedarf an.
+
+    Gehört der gespeicherte Plan zu einer früheren Woche, gilt der Kalender
+    der aktuellen Woche (vorausgeplant oder ``None``).
+    """
+    query = "SELECT plan, lang, version, week FROM profile_state WHERE profile = ?"
+    with db.get_db() as conn:
+        row = conn.execute(query, (profile,)).fetchone()
+        if row is None:
+            legacy = _legacy_state() if profile == DEFAULT_PROFILE else {}
+            conn.execute(
+                "INSERT OR IGNORE INTO profile_state (profile, plan, lang) VALUES (?, ?, ?)",
+                (profile, json.dumps(legacy["plan"]) if legacy.get("plan") else None,
+                 legacy.get("lang") or "DE")
+            )
+            conn.commit()
+            db.mark_own_write()
+            row = conn.execute(query, (profile,)).fetchone()
+        plan = _current_plan(conn, profile, row)
+    _remember(profile, row["version"])
+    return plan, row["lang"], row["version"]
+
+
+def read_user_state(profile=DEFAULT_PROFILE):
+    """Wie ``load_user_state``, schreibt aber nie (für die API).
+
+    Unbekannte Profile werden nicht angelegt, sondern liefern einen leeren Plan.
+    """
+    with db.get_db() as conn:
+        row = conn.execute(
+            "SELECT plan, lang, version, week FROM profile_state WHERE profile = ?", (profile,)
+        ).fetchone()
+        if row is None:
+            legacy = _legacy_state() if profile == DEFAULT_PROFILE else {}
+            return legacy.get("plan"), legacy.get("lang") or "DE", 0
+        return _current_plan(conn, profile, row), row["lang"], row["version"]
+
+
+def _current_plan(conn, profile, row):
+    """Plan der Zeile; gehört er zu einer früheren Woche, der Kalender dieser Woche."""
+    monday = week_start()
+    if row["week"] is not None and row["week"] != monday.isoformat():
+        return read_week(conn, profile, monday)
+    return json.loads(row["plan"]) if row["plan"] else None
+
+
+def save_user_state(profile, plan, lang, version):
+    """Schreibt Plan und Sprache, falls ``version`` noch die aktuelle ist.
+
+    Der Plan gilt für die aktuelle Woche und wird ab heute in den Kalender
+    übernommen. Gibt die neue Version zurück oder ``None``, wenn ein anderes
+    Gerät inzwischen geschrieben hat; dann gilt dessen Stand.
+    """
+    monday = week_start()
+    with db.get_db() as conn:
+        cur = conn.execute(
+            "UPDATE profile_state SET plan = ?, lang = ?, week = ?, version = version + 1"
+            " WHERE profile = ? AND version = ?",
+            (json.dumps(plan) if plan else None, lang, monday.isoformat(), profile, version)
+        )
+        if cur.rowcount and plan:
+            write_week(conn, profile, monday, plan)
+        conn.commit()
+    if cur.rowcount == 0:
+        return None
+    db.mark_own_write()
+    _remember(profile, version + 1)
+    return version + 1
+
+
+def state_version(profile=DEFAULT_PROFILE):
+    """Aktuelle Version des Profils; fragt die Datenbank nur nach fremden Schreibzugriffen."""
+    generation = db.data_generation()
+    with _lock:
+        cached = _versions.get(profile)
+        if cached is not None and cached[0] == generation:
+            _versions.move_to_end(profile)
+            return cached[1]
+    with db.get_db() as conn:
+        row = conn.execute("SELECT version FROM profile_state WHERE profile = ?", (profile,)).fetchone()
+    if row is None:
+        return 0  # unbekanntes Profil: nicht merken
+    _remember(profile, row["version"])
+    return row["version"]
@@ -0,0 +1 @@
+"""Ansichten der Streamlit-App; run.py ruft pro Rerun nur die aktive auf."""
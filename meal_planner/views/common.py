@@ -0,0 +1,92 @@
+import os
+
+import streamlit as st
+
+from db import delete_meal
+from plan_history import week_start
+from translations import CATEGORY_LABELS, UI
+from user_state import POLL_INTERVAL, load_user_state, save_user_state, state_version
+
+# Farben pro Kategorie
+CATEGORY_COLORS = {
+    "Vegan":      "#27ae60",
+    "Vegetarisch":"#f1c40f",
+    "Fleisch":    "#c0392b"
+}
+
+# Dünneres CSS-Upgrade, einmal pro Prozess eingelesen
+with open(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app.css"), encoding="utf-8") as f:
+    APP_CSS = f"<style>\n{f.read()}</style>"
+
+
+def inject_css():
+    st.markdown(APP_CSS, unsafe_allow_html=True)
+
+
+def category_label(category, lang):
+    return CATEGORY_LABELS.get(category, {"DE": category, "EN": category})[lang]
+
+
+def delete_and_refresh(meal_id):
+    delete_meal(meal_id)
+    st.rerun()
+
+
+def show_meal_detail(meal_id):
+    st.session_state.detail = meal_id
+    st.rerun()
+
+
+def meal_grid(meals, lang):
+    """Zeigt Mahlzeiten als Karten in vier Spalten (Verwaltungsansicht)."""
+    cols = st.columns(4)
+    for i, meal in enumerate(meals):
+        color = CATEGORY_COLORS.get(meal["category"], "#333")
+        with cols[i % 4]:
+            st.markdown(f"<div class='meal-card' style='background:{color}'>", unsafe_allow_html=True)
+            st.markdown(
+                f"**{meal['name']} ({category_label(meal['category'], lang)})**",
+                unsafe_allow_html=True
+            )
+            if st.button(UI["details"][lang], key=f"detail_manage_{meal['id']}"):
+                show_meal_detail(meal['id'])
+            if st.button(UI["delete"][lang], key=f"del_manage_{meal['id']}"):
+                delete_and_refresh(meal['id'])
+            st.markdown("</div>", unsafe_allow_html=True)
+
+
+# ---------------------------------------------------
+# Plan + Sprache des Profils (geteilt zwischen Geräten)
+# ---------------------------------------------------
+def load_state():
+    """Übernimmt den gespeicherten Stand des Profils in die Sitzung."""
+    ss = st.session_state
+    ss.plan, ss.lang, ss.state_version = load_user_state(ss.profile)
+    ss.state_week = week_start()
+    ss.state_base = (dict(ss.plan or {}), ss.lang)
+
+
+def sync_state():
+    """Schreibt lokale Änderungen oder übernimmt neuere Stände anderer Geräte.
+
+    Nur Callbacks und der Anfang des Skripts rufen das auf, also bevor das
+    Sprach-Widget gezeichnet wird.
+    """
+    ss = st.session_state
+    if (dict(ss.plan or {}), ss.lang) != ss.state_base:
+        version = save_user_state(ss.profile, ss.plan, ss.lang, ss.state_version)
+        if version is not None:
+            ss.state_version = version
+            ss.state_base = (dict(ss.plan or {}), ss.lang)
+            return
+        ss.state_conflict = True  # anderes Gerät war schneller, dessen Stand gilt
+    elif state_version(ss.profile) == ss.state_version and ss.state_week == week_start():
+        return
+    load_state()
+
+
+@st.fragment(run_every=POLL_INTERVAL)
+def watch_state():
+    """Fragt regelmäßig die Version ab; nur bei Änderungen läuft die Seite neu."""
+    if state_version(st.session_state.profile) != st.session_state.state_version:
+        st.rerun()
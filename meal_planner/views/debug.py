@@ -0,0 +1,18 @@
+import streamlit as st
+
+from translations import UI
+
+
+def render(lang, m):
+    """Debug-Panel: Messwerte des laufenden Reruns (``metrics.RerunMetrics``)."""
+    st.sidebar.caption(UI["debug_summary"][lang].format(
+        m.queries, m.query_ms, m.connections, m.new_connections, m.elapsed_ms
+    ))
+    st.sidebar.table([
+        {"section": name, "ms": round(ms, 2), "SQL": queries}
+        for name, ms, queries in m.sections
+    ])
+    for sql, count in m.repeated():
+        st.sidebar.warning(f"{UI['debug_repeated'][lang]}: {count}× `{sql}`")
+    for sql, ms in m.slow:
+        st.sidebar.error(f"{UI['debug_slow'][lang]}: {ms:.1f} ms `{sql}`")
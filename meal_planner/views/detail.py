@@ -0,0 +1,139 @@
+import sqlite3
+
+import streamlit as st
+
+from db import (CATEGORIES, add_ingredient, delete_ingredient, delete_meal, get_meal, get_meals_by_ids, get_recipe,
+                update_meal, update_recipe)
+from translations import UI
+from units import format_ingredient
+from views.common import CATEGORY_COLORS, category_label
+
+
+def add_ingredient_input(meal_id):
+    """Callback: Zutat aus dem Eingabefeld anlegen und das Feld leeren."""
+    key = f"new_ing_{meal_id}"
+    new_ing = st.session_state.get(key, "").strip()
+    if new_ing:
+        add_ingredient(meal_id, new_ing)
+        st.session_state[key] = ""
+
+
+def save_recipe(meal_id):
+    update_recipe(meal_id, st.session_state[f"recipe_{meal_id}"])
+    st.session_state[f"recipe_saved_{meal_id}"] = True
+
+
+@st.fragment
+def ingredient_editor(meal_id, lang):
+    """Zutatenliste; Hinzufügen/Löschen laufen nur in diesem Fragment neu."""
+    _, ings = get_meal(meal_id)
+    st.markdown(f"#### {'Zutaten' if lang=='DE' else 'Ingredients'}")
+    for ing in ings:
+        col1, col2 = st.columns([4,1])
+        col1.write(format_ingredient(ing["name"], ing["quantity"], ing["unit"]))
+        col2.button(UI["delete"][lang], key=f"del_ing_{ing['id']}",
+                    on_click=delete_ingredient, args=(ing['id'],))
+
+    st.text_input(
+        "➕ " + ("Neue Zutat" if lang=="DE" else "New ingredient"),
+        key=f"new_ing_{meal_id}", placeholder=UI["ing_placeholder"][lang]
+    )
+    st.button(
+        "✔️ " + ("Hinzufügen" if lang=="DE" else "Add"),
+        key=f"add_ing_{meal_id}", on_click=add_ingredient_input, args=(meal_id,)
+    )
+
+
+@st.fragment
+def recipe_editor(meal_id, lang):
+    """Rezepttext (erst hier geladen); Speichern läuft nur in diesem Fragment neu."""
+    st.markdown(f"#### {'Rezept' if lang=='DE' else 'Recipe'}")
+    st.text_area(
+        ("Rezept bearbeiten" if lang=="DE" else "Edit recipe"),
+        get_recipe(meal_id),
+        key=f"recipe_{meal_id}"
+    )
+    st.button(
+        "💾 " + ("Speichern" if lang=="DE" else "Save"),
+        key=f"save_recipe_{meal_id}", on_click=save_recipe, args=(meal_id,)
+    )
+    if st.session_state.pop(f"recipe_saved_{meal_id}", False):
+        st.success("✔️ " + ("Rezept gespeichert!" if lang=="DE" else "Recipe saved!"))
+
+
+def render(lang):
+    if st.session_state.detail:
+        # Nur Kopfdaten aus dem Katalog; die Zutaten lädt ingredient_editor selbst
+        meal = get_meals_by_ids([st.session_state.detail])[0].get(st.session_state.detail)
+        if meal:
+            st.markdown("---")
+            # Farbe dynamisch basierend auf DB-Wert
+            color = CATEGORY_COLORS.get(meal["category"], "#333")
+            st.markdown(f"<div class='meal-card' style='background:{color}'>", unsafe_allow_html=True)
+
+            # Name + Kategorie + Stift zum Bearbeiten
+            col_name, col_edit = st.columns([4,1])
+            col_name.markdown(
+                f"### {meal['name']} ({category_label(meal['category'], lang)})",
+                unsafe_allow_html=True
+            )
+            if col_edit.button("✏️", key=f"edit_btn_{meal['id']}"):
+                st.session_state[f"edit_meal_{meal['id']}"] = True
+
+            st.markdown("</div>", unsafe_allow_html=True)
+
+            # Bearbeitungsformular nur anzeigen, wenn Flag gesetzt
+            if st.session_state.get(f"edit_meal_{meal['id']}", False):
+                with st.form(f"edit_meal_form_{meal['id']}"):
+                    new_name = st.text_input(
+                        ("Gericht" if lang=="DE" else "Meal name"),
+                        value=meal["name"]
+                    )
+                    new_category = st.selectbox(
+                        ("Kategorie" if lang=="DE" else "Category"),
+                        options=CATEGORIES,
+                        index=CATEGORIES.index(meal["category"]),
+                        format_func=lambda c: category_label(c, lang)
+                    )
+                    new_servings = st.number_input(
+                        UI["servings"][lang], min_value=1, max_value=50, value=meal["servings"]
+                    )
+                    submitted = st.form_submit_button("💾 " + ("Speichern" if lang=="DE" else "Save"))
+                    if submitted:
+                        # Update in DB (Name ist eindeutig)
+                        try:
+                            update_meal(meal['id'], new_name, new_category, int(new_servings))
+                        except sqlite3.IntegrityError:
+                            st.warning(UI["exists"][lang])
+                            st.stop()
+
+                        # Formular schließen
+                        st.session_state[f"edit_meal_{meal['id']}"] = False
+
+                        # Wochenplan ggf. aktualisieren, damit Farbe sofort passt
+                        for tag, m_id in st.session_state.plan.items():
+                            if m_id == meal['id']:
+                                st.session_state.plan[tag] = m_id
+
+                        st.rerun()
+
+            ingredient_editor(meal['id'], lang)
+            recipe_editor(meal['id'], lang)
+
+            # Löschen / Zurück
+            c1, c2 = st.columns(2)
+            with c1:
+                if st.button(UI["delete"][lang], key=f"del_meal_{meal['id']}"):
+                    delete_meal(meal['id'])
+                    st.session_state.detail = None
+                    st.rerun()
+            with c2:
+                if st.button(UI["back"][lang], key=f"back_{meal['id']}"):
+                    st.session_state.detail = None
+                    st.rerun()
+
+        else:
+            st.error(UI["no_exist"][lang])
+            if st.button(UI["back"][lang]):
+                st.session_state.detail = None
+                st.rerun()
@@ -0,0 +1,63 @@
+import datetime
+
+import streamlit as st
+
+from plan_engine import Constraints, PlanError
+from plan_history import generate_weeks, get_entries, week_start
+from translations import DAYS, UI
+from views.common import category_label
+
+# So weit zeigt der Verlauf auch vorausgeplante Wochen
+AHEAD_MAX_WEEKS = 8
+
+
+def plan_ahead(lang):
+    with st.form("plan_ahead"):
+        weeks = st.number_input(UI["ahead_weeks"][lang], min_value=1, max_value=AHEAD_MAX_WEEKS, value=4)
+        if st.form_submit_button(UI["ahead_button"][lang]):
+            rules = st.session_state.plan_rules
+            constraints = Constraints(
+                max_per_category=rules["max_per_category"], no_repeats=rules["no_repeats"]
+            )
+            try:
+                planned = generate_weeks(
+                    st.session_state.profile,
+                    week_start() + datetime.timedelta(weeks=1),
+                    int(weeks),
+                    constraints,
+                    recent_weeks=rules.get("recent_weeks", 0),
+                )
+            except PlanError as e:
+                st.warning(UI["plan_error"][lang] + str(e))
+            else:
+                st.success(UI["ahead_result"][lang].format(planned))
+
+
+def render(lang):
+    st.title(UI["history_title"][lang])
+    st.markdown(UI["history_desc"][lang])
+
+    plan_ahead(lang)
+
+    weeks_back = st.slider(UI["history_weeks"][lang], 1, 52, 8, key="history_weeks")
+    monday = week_start()
+    rows = get_entries(
+        st.session_state.profile,
+        monday - datetime.timedelta(weeks=weeks_back),
+        monday + datetime.timedelta(weeks=AHEAD_MAX_WEEKS + 1),
+    )
+    if not rows:
+        st.info(UI["history_empty"][lang])
+        return
+    st.dataframe(
+        [
+            {
+                UI["col_date"][lang]: row["date"],
+                UI["col_day"][lang]: DAYS[lang][datetime.date.fromisoformat(row["date"]).weekday()],
+                UI["col_meal"][lang]: row["name"] or "–",
+                UI["col_category"][lang]: category_label(row["category"], lang) if row["category"] else "",
+            }
+            for row in reversed(rows)  # neueste zuerst
+        ],
+        hide_index=True,
+    )
@@ -0,0 +1,154 @@
+import io
+import os
+import sqlite3
+
+import streamlit as st
+
+import bulk_io
+import maintenance
+from db import CATEGORIES, DEFAULT_SERVINGS, add_meal, get_meals_page, search_meals
+from plan_engine import current_catalog
+from translations import UI
+from units import split_ingredients
+from views.common import CATEGORY_COLORS, category_label, load_state, meal_grid
+
+# Seitengrößen der Verwaltungsansicht
+PAGE_SIZES = [12, 24, 48, 96]
+
+
+def restore_backup(path):
+    """Callback: vor dem Rerun, damit load_state() auch die Sprache setzen darf."""
+    try:
+        maintenance.restore(path)
+    except (maintenance.MaintenanceError, sqlite3.Error, OSError) as e:
+        st.session_state.backup_error = str(e)
+    else:
+        load_state()  # Plan und Sprache aus dem wiederhergestellten Stand
+        st.session_state.backup_error = ""
+
+
+def render(lang):
+    st.title(UI["manage_title"][lang])
+    st.markdown(UI["manage_desc"][lang])
+
+    # Neue Mahlzeit hinzufügen
+    with st.expander(UI["new_meal"][lang]):
+        with st.form("add_meal_form"):
+            name = st.text_input(UI["form_name"][lang], key="add_name")
+            category = st.selectbox(
+                UI["form_category"][lang],
+                options=CATEGORIES,
+                format_func=lambda c: category_label(c, lang)
+            )
+            recipe = st.text_area(UI["form_recipe"][lang], key="add_recipe")
+            ingredients = st.text_input(
+                UI["form_ings"][lang], key="add_ings", placeholder=UI["ings_placeholder"][lang]
+            )
+            servings = st.number_input(
+                UI["servings"][lang], min_value=1, max_value=50, value=DEFAULT_SERVINGS, key="add_servings"
+            )
+            submitted = st.form_submit_button(UI["add_button"][lang])
+            if submitted and name and category:
+                try:
+                    add_meal(name, category, recipe, split_ingredients(ingredients), int(servings))
+                except sqlite3.IntegrityError:
+                    st.warning(UI["exists"][lang])
+                else:
+                    st.success(UI["success_add"][lang])
+                    st.rerun()
+
+    # Import / Export (altes meals.json, CSV, JSON Lines)
+    with st.expander(UI["bulk_title"][lang]):
+        upload = st.file_uploader(UI["bulk_file"][lang], type=["json", "csv", "jsonl", "ndjson"], key="bulk_upload")
+        bulk_category = st.selectbox(
+            UI["bulk_category"][lang],
+            options=CATEGORIES,
+            index=CATEGORIES.index(bulk_io.DEFAULT_CATEGORY),
+            format_func=lambda c: category_label(c, lang),
+            key="bulk_category"
+        )
+        if upload is not None and st.button(UI["bulk_import"][lang], key="bulk_import"):
+            reader = bulk_io.READERS[bulk_io.detect_format(upload.name)]
+            try:
+                imported, skipped = bulk_io.import_meals(
+                    reader(io.TextIOWrapper(upload, encoding="utf-8-sig", newline=""), bulk_category)
+                )
+            except (ValueError, KeyError, UnicodeDecodeError) as e:
+                st.error(UI["bulk_error"][lang] + str(e))
+            else:
+                st.success(UI["bulk_result"][lang].format(imported, skipped))
+        # Export erst beim Klick erzeugen (Callable), nicht bei jedem Rerun
+        c1, c2 = st.columns(2)
+        c1.download_button(
+            "⬇️ JSON Lines", lambda: "".join(bulk_io.iter_export_jsonl()),
+            file_name="meals.jsonl", mime="application/x-ndjson", key="export_jsonl"
+        )
+        c2.download_button(
+            "⬇️ CSV", lambda: "".join(bulk_io.iter_export_csv()),
+            file_name="meals.csv", mime="text/csv", key="export_csv"
+        )
+
+    # Sicherungen (werden auch automatisch im Leerlauf angelegt)
+    with st.expander(UI["backup_title"][lang]):
+        if st.button(UI["backup_now"][lang], key="backup_now"):
+            try:
+                st.success(UI["backup_done"][lang] + os.path.basename(maintenance.backup()))
+            except (sqlite3.Error, OSError) as e:
+                st.error(UI["backup_error"][lang] + str(e))
+        backups = maintenance.list_backups()
+        if not backups:
+            st.caption(UI["backup_none"][lang])
+        else:
+            chosen = st.selectbox(UI["backup_pick"][lang], backups, format_func=os.path.basename, key="backup_pick")
+            confirm = st.checkbox(UI["backup_confirm"][lang], key="backup_confirm")
+            st.button(UI["backup_restore"][lang], key="backup_restore", disabled=not confirm,
+                      on_click=restore_backup, args=(chosen,))
+        error = st.session_state.pop("backup_error", None)
+        if error:
+            st.error(UI["backup_error"][lang] + error)
+        elif error is not None:
+            st.success(UI["backup_restored"][lang])
+
+    # Suche (Volltext, Präfix-Treffer)
+    query = st.text_input(UI["search"][lang], key="search_query")
+    if query.strip():
+        results = search_meals(query)
+        if results:
+            meal_grid(results, lang)
+        else:
+            st.info(UI["no_results"][lang])
+    else:
+        # Kategorien zugeklappt; nur geöffnete werden abgefragt, seitenweise
+        page_size = st.selectbox(UI["page_size"][lang], PAGE_SIZES, index=1, key="page_size")
+        catalog = current_catalog()
+        for cat in CATEGORIES:
+            color = CATEGORY_COLORS.get(cat, "#333")
+            count = len(catalog.by_category.get(cat, ()))
+            st.markdown(
+                f"<h3 class='category-header' style='color:{color}'>{category_label(cat, lang)} ({count})</h3>",
+                unsafe_allow_html=True
+            )
+            if not st.toggle(UI["show_cat"][lang], key=f"open_{cat}"):
+                continue
+
+            # Blätterzustand: Liste der "nach ID"-Cursor, neu bei geänderter Seitengröße
+            size, cursors = st.session_state.page_cursors.get(cat, (page_size, [None]))
+            if size != page_size:
+                cursors = [None]
+            st.session_state.page_cursors[cat] = (page_size, cursors)
+
+            rows = get_meals_page(cat, cursors[-1], page_size + 1)
+            if not rows and len(cursors) > 1:
+                # Seite leer geworden (z. B. gelöscht): zurück zum Anfang
+                cursors[:] = [None]
+                rows = get_meals_page(cat, None, page_size + 1)
+            meal_grid(rows[:page_size], lang)
+
+            c_prev, c_page, c_next = st.columns([1, 2, 1])
+            if len(cursors) > 1 and c_prev.button(UI["prev"][lang], key=f"prev_{cat}"):
+                cursors.pop()
+                st.rerun()
+            c_page.caption(f"{UI['page'][lang]} {len(cursors)} / {max(1, -(-count // page_size))}")
+            if len(rows) > page_size and c_next.button(UI["next"][lang], key=f"next_{cat}"):
+                cursors.append(rows[page_size - 1]["id"])
+                st.rerun()
@@ -0,0 +1,44 @@
+import streamlit as st
+
+from db import get_meals_by_ids
+from pantry import current_index, food_ids
+from translations import UI
+from views.common import CATEGORY_COLORS, category_label, show_meal_detail
+
+# Angezeigte Treffer
+RESULT_LIMIT = 30
+
+
+def render(lang):
+    st.title(UI["pantry_title"][lang])
+    st.markdown(UI["pantry_desc"][lang])
+
+    # Key "pantry": der Vorrat gilt auch für die Planung (run.py hält ihn über Seitenwechsel)
+    st.text_area(UI["pantry_input"][lang], key="pantry", placeholder=UI["ings_placeholder"][lang])
+    max_missing = st.slider(UI["pantry_missing"][lang], 0, 10, 2, key="pantry_max_missing")
+
+    have = food_ids(st.session_state.pantry)
+    if not have:
+        return
+    ranked = current_index().rank(have, max_missing, RESULT_LIMIT)
+    if not ranked:
+        st.info(UI["pantry_none"][lang])
+        return
+
+    meals, ings = get_meals_by_ids((meal_id for meal_id, _, _ in ranked), with_ingredients=True)
+    for meal_id, missing, _ in ranked:
+        meal = meals.get(meal_id)
+        if meal is None:
+            continue
+        color = CATEGORY_COLORS.get(meal["category"], "#333")
+        lacking = [ing["name"] for ing in ings.get(meal_id, ()) if ing["food_id"] not in have]
+        col1, col2 = st.columns([4, 1])
+        col1.markdown(
+            f"<div class='meal-card' style='background:{color}'><b>{meal['name']}</b> "
+            f"({category_label(meal['category'], lang)})<br>"
+            + (f"{UI['pantry_lacks'][lang]}: {', '.join(dict.fromkeys(lacking))}" if missing else UI["pantry_all"][lang])
+            + "</div>",
+            unsafe_allow_html=True,
+        )
+        if col2.button(UI["details"][lang], key=f"detail_pantry_{meal_id}"):
+            show_meal_detail(meal_id)
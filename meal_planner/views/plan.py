@@ -0,0 +1,201 @@
+from dataclasses import replace
+
+import streamlit as st
+
+from db import CATEGORIES, get_meals_by_ids
+from pantry import cookable
+from plan_engine import Constraints, PlanError, current_catalog, generate, reroll
+from plan_history import recent_meals
+from similarity import different_meals, similar_meals
+from translations import DAYS, UI
+from views.common import CATEGORY_COLORS, category_label, show_meal_detail, sync_state
+
+
+# Gerichte, aus denen "Ähnlich" / "Anders" wählt
+REROLL_CHOICES = 5
+
+
+# Planungsregeln aus der Sitzung; ``preferred`` ersetzt den Vorrat als Vorzug
+def plan_constraints(preferred=None):
+    rules = st.session_state.plan_rules
+    plan = st.session_state.plan or {}
+    if preferred is None:
+        preferred = cookable(st.session_state.pantry) if rules.get("use_pantry") else frozenset()
+    return Constraints(
+        max_per_category=rules["max_per_category"],
+        no_repeats=rules["no_repeats"],
+        recent=recent_meals(st.session_state.profile, rules.get("recent_weeks", 0)),
+        preferred=preferred,
+        pinned={tag: plan.get(tag) for tag in st.session_state.pinned},
+    )
+
+
+def run_planner(planner, *args, preferred=None):
+    """Ruft generate()/reroll() mit den Sitzungsregeln auf.
+
+    Reichen die Gerichte nicht für eine Woche ohne Wiederholungen bzw. ohne
+    die zuletzt gekochten Gerichte, wird ohne diese Regeln geplant und der
+    Grund in ``plan_relaxed`` vermerkt (Hinweis an den Benutzer). Andere
+    Konflikte landen in ``plan_error``.
+    """
+    constraints = plan_constraints(preferred)
+    st.session_state.plan_error = None
+    st.session_state.plan_relaxed = None
+    try:
+        return planner(current_catalog(), *args, constraints)
+    except PlanError as e:
+        if constraints.no_repeats or constraints.recent:
+            try:
+                relaxed = replace(constraints, no_repeats=False, recent=frozenset())
+                result = planner(current_catalog(), *args, relaxed)
+            except PlanError:
+                pass
+            else:
+                st.session_state.plan_relaxed = str(e)
+                return result
+        st.session_state.plan_error = str(e)
+        return None
+
+
+def init_plan():
+    """Woche initialisieren (nur einmal, für beide Sprachen)."""
+    if st.session_state.plan is None:
+        st.session_state.plan = (
+            run_planner(generate, DAYS["DE"])  # interne Schlüssel immer DE
+            or {tag: None for tag in DAYS["DE"]}
+        )
+        sync_state()
+
+
+def reroll_day(day, mode=None):
+    """Callback: würfelt einen Tag neu, bevor das Fragment der Tageskarte neu läuft.
+
+    ``mode`` "similar"/"different" bevorzugt Gerichte mit ähnlichen bzw.
+    anderen Zutaten als das bisherige; die Planungsregeln gelten weiter.
+    """
+    preferred = None
+    current = st.session_state.plan.get(day)
+    if mode and current is not None:
+        pick = similar_meals if mode == "similar" else different_meals
+        preferred = frozenset(pick(current, REROLL_CHOICES))
+    meal_id = run_planner(reroll, st.session_state.plan, day, preferred=preferred)
+    # Hinweise nur an der Tageskarte, nicht über dem ganzen Plan
+    st.session_state[f"reroll_relaxed_{day}"] = st.session_state.plan_relaxed
+    st.session_state.plan_relaxed = None
+    if meal_id is not None:
+        st.session_state.plan[day] = meal_id
+    else:
+        # Nur dieser Tag betroffen: Meldung an der Tageskarte statt über dem ganzen Plan
+        st.session_state[f"reroll_error_{day}"] = st.session_state.plan_error
+        st.session_state.plan_error = None
+    sync_state()
+
+
+def reroll_week():
+    """Callback: ganze Woche neu würfeln (fixierte Tage bleiben)."""
+    plan = run_planner(generate, DAYS["DE"])
+    if plan:
+        st.session_state.plan = plan
+    sync_state()
+
+
+@st.fragment
+def day_card(i, lang):
+    """Karte eines Wochentags; Neu-Würfeln und Fixieren laufen nur hier neu."""
+    if st.session_state.get("state_conflict"):
+        st.rerun()  # Stand eines anderen Geräts übernommen: ganze Seite neu
+    tag_de = DAYS["DE"][i]                # interne Schlüssel immer DE
+    meal_id = st.session_state.plan.get(tag_de)
+    meals, _ = get_meals_by_ids([meal_id])  # aus dem Katalog-Cache, ohne Abfrage
+    meal = meals.get(meal_id)
+
+    st.markdown(f"**{DAYS[lang][i]}**", unsafe_allow_html=True)  # Übersetzt für UI
+    if meal:
+        color = CATEGORY_COLORS.get(meal["category"], "#333")
+        st.markdown(f"<div class='meal-card' style='background:{color}'>", unsafe_allow_html=True)
+        st.write(meal["name"])
+        if st.button(UI["details"][lang], key=f"detail_{tag_de}"):
+            show_meal_detail(meal_id)
+        st.button(
+            UI["reroll"][lang], key=f"reroll_{tag_de}", help=UI["reroll_help"][lang],
+            on_click=reroll_day, args=(tag_de,)
+        )
+        similar_col, different_col = st.columns(2)
+        similar_col.button(
+            UI["reroll_similar"][lang], key=f"reroll_similar_{tag_de}",
+            help=UI["reroll_similar_help"][lang], on_click=reroll_day, args=(tag_de, "similar")
+        )
+        different_col.button(
+            UI["reroll_different"][lang], key=f"reroll_different_{tag_de}",
+            help=UI["reroll_different_help"][lang], on_click=reroll_day, args=(tag_de, "different")
+        )
+        if st.checkbox(UI["pin"][lang], value=tag_de in st.session_state.pinned,
+                       key=f"pin_{tag_de}", help=UI["pin_help"][lang]):
+            st.session_state.pinned.add(tag_de)
+        else:
+            st.session_state.pinned.discard(tag_de)
+        st.markdown("</div>", unsafe_allow_html=True)
+    else:
+        st.markdown("<div class='meal-card' style='background:#555'><i>–</i></div>", unsafe_allow_html=True)
+
+    error = st.session_state.pop(f"reroll_error_{tag_de}", None)
+    if error:
+        st.toast(UI["plan_error"][lang] + error)
+    relaxed = st.session_state.pop(f"reroll_relaxed_{tag_de}", None)
+    if relaxed:
+        st.toast(UI["plan_relaxed"][lang] + relaxed)
+
+
+@st.fragment
+def plan_grid(lang):
+    """Die sieben Tageskarten; "Woche neu würfeln" läuft nur hier neu."""
+    if st.session_state.get("state_conflict"):
+        st.rerun()  # Stand eines anderen Geräts übernommen: ganze Seite neu
+    cols = st.columns(7)
+    for i in range(len(DAYS["DE"])):
+        with cols[i]:
+            day_card(i, lang)
+
+    if st.session_state.plan_error:
+        st.warning(UI["plan_error"][lang] + st.session_state.plan_error)
+    elif st.session_state.plan_relaxed:
+        st.info(UI["plan_relaxed"][lang] + st.session_state.plan_relaxed)
+
+    # Ganze Woche neu würfeln (fixierte Tage bleiben)
+    st.button(UI["reroll_week"][lang], on_click=reroll_week)
+
+
+def render(lang):
+    st.title(UI["plan_title"][lang])
+    st.markdown(UI["plan_header"][lang])
+
+    plan_grid(lang)
+
+    with st.expander(UI["rules"][lang]):
+        rules = st.session_state.plan_rules
+        rules["no_repeats"] = st.checkbox(
+            UI["no_repeats"][lang], value=rules["no_repeats"], key="rule_no_repeats"
+        )
+        rules["use_pantry"] = st.checkbox(
+            UI["use_pantry"][lang], value=rules.get("use_pantry", False),
+            key="rule_use_pantry", help=UI["use_pantry_help"][lang]
+        )
+        rules["recent_weeks"] = st.number_input(
+            UI["recent_weeks"][lang], min_value=0, max_value=12,
+            value=rules.get("recent_weeks", 0), key="rule_recent_weeks"
+        )
+        for cat in CATEGORIES:
+            limit = st.number_input(
+                f"{UI['max_per_week'][lang]}: {category_label(cat, lang)}",
+                min_value=0,
+                max_value=len(DAYS["DE"]),
+                value=rules["max_per_category"].get(cat, len(DAYS["DE"])),
+                key=f"rule_max_{cat}",
+            )
+            if limit < len(DAYS["DE"]):
+                rules["max_per_category"][cat] = limit
+            else:
+                rules["max_per_category"].pop(cat, None)
+
+    st.divider()
+    st.markdown(UI["tip"][lang])
@@ -0,0 +1,36 @@
+import streamlit as st
+
+from db import get_shopping_list
+from quantities import DEFAULT_HOUSEHOLD, shopping_amounts
+from shopping import iter_csv, iter_text
+from translations import UI
+from units import format_amount
+
+
+def render(lang):
+    st.title(UI["shopping_title"][lang])
+    st.markdown(UI["shopping_desc"][lang])
+
+    household = st.number_input(
+        UI["household"][lang], min_value=1, max_value=20, value=DEFAULT_HOUSEHOLD, key="household"
+    )
+    meal_ids = list(st.session_state.plan.values())
+    amounts = shopping_amounts(meal_ids, household)
+    rows = [
+        dict(row, amount=" + ".join(format_amount(q, unit) for q, unit in amounts.get(row["food_id"], ())))
+        for row in get_shopping_list(meal_ids)
+    ]
+    if rows:
+        st.markdown("".join(iter_text(rows)))
+        # Dateien erst beim Klick erzeugen (Callable), nicht bei jedem Rerun
+        c1, c2 = st.columns(2)
+        c1.download_button(
+            UI["export_txt"][lang], lambda: "".join(iter_text(rows)),
+            file_name="einkaufsliste.txt", mime="text/plain", key="shopping_txt"
+        )
+        c2.download_button(
+            UI["export_csv"][lang], lambda: "".join(iter_csv(rows)),
+            file_name="einkaufsliste.csv", mime="text/csv", key="shopping_csv"
+        )
+    else:
+        st.info(UI["shopping_empty"][lang])